@@ -1,5 +1,4 @@
-from app import db, User
-from werkzeug.security import generate_password_hash
+from app import create_app, db, User
 
 def add_demo_user():
     email = 'demo@klant.nl'
@@ -23,8 +22,6 @@ def add_demo_user():
     db.session.commit()
     print(f"Demo gebruiker '{name}' ({email}) aangemaakt met wachtwoord: {password}")
 
-from app import app
-
 if __name__ == '__main__':
-    with app.app_context():
+    with create_app().app_context():
         add_demo_user()
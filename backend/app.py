@@ -1,67 +1,217 @@
-from flask import Flask, jsonify, request
+from flask import (
+    Blueprint, Flask, Request, Response, current_app, g, has_request_context, jsonify, request, send_file,
+    stream_with_context,
+)
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_mail import Mail, Message
-from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, jwt_required
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt, get_jwt_identity, jwt_required
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+import csv
+import gzip
+import hashlib
+import io
+import json
+import math
 import os
-import os
-from flask import Flask
-from flask_cors import CORS
+import queue
+import re
+import tempfile
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
 
-# DEBUG: Toon huidige werkdirectory en databasepad
-print('WORKDIR:', os.getcwd())
-print('DB PATH:', os.path.abspath('insurance.db'))
-
-load_dotenv()
-
-app = Flask(__name__)
-
-# Configure CORS and basic settings
-app.config['PROPAGATE_EXCEPTIONS'] = True
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///insurance.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['MAIL_SERVER'] = os.getenv('SMTP_HOST', 'localhost')
-app.config['MAIL_PORT'] = int(os.getenv('SMTP_PORT', '587'))
-app.config['MAIL_USERNAME'] = os.getenv('SMTP_USER', '')
-app.config['MAIL_PASSWORD'] = os.getenv('SMTP_PASS', '')
-app.config['MAIL_USE_TLS'] = True
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key-here')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
-
-db = SQLAlchemy(app)
-mail = Mail(app)
-jwt = JWTManager(app)
-
-CORS(
-    app,
-    resources={
-        r"/api/*": {
-            "origins": [
-                "https://insurance-advisor-portal.vercel.app",
-                "http://localhost:5175"
-            ],
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
-        }
+# Optionele versnellers: zonder deze pakketten valt de app terug op de standaard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import redis
+except ImportError:
+    redis = None
+try:
+    import fcntl  # niet op Windows; daar draait gunicorn ook niet
+except ImportError:
+    fcntl = None
+
+# Extensies en routes worden pas in create_app aan een app gekoppeld; importeren doet geen I/O
+db = SQLAlchemy()
+mail = Mail()
+jwt = JWTManager()
+api = Blueprint('api', __name__)
+
+def sqlite_pragmas():
+    """PRAGMA's die op elke nieuwe SQLite verbinding worden gezet (zie configure_sqlite_engine)."""
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-64000')),  # negatief = KiB
     }
-)
+
+def load_config(app):
+    """Configuratie uit de omgeving (en .env)."""
+    app.config['PROPAGATE_EXCEPTIONS'] = True
+    app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', '100')) * 1024 * 1024
+    app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', os.path.join(app.instance_path, 'documents'))
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///insurance.db').replace('postgres://', 'postgresql://', 1)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config['SQLITE_PRAGMAS'] = sqlite_pragmas()
+    else:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+            'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        }
+    app.config['MAIL_SERVER'] = os.getenv('SMTP_HOST', 'localhost')
+    app.config['MAIL_PORT'] = int(os.getenv('SMTP_PORT', '587'))
+    app.config['MAIL_USERNAME'] = os.getenv('SMTP_USER', '')
+    app.config['MAIL_PASSWORD'] = os.getenv('SMTP_PASS', '')
+    app.config['MAIL_USE_TLS'] = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+    app.config['MAIL_DEFAULT_SENDER'] = os.getenv('SMTP_FROM', 'noreply@riskproactief.nl')
+    app.config['MAIL_OUTBOX_BATCH_SIZE'] = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', '50'))
+    app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', '8'))
+    app.config['MAIL_OUTBOX_RETRY_SECONDS'] = int(os.getenv('MAIL_OUTBOX_RETRY_SECONDS', '30'))
+    app.config['MAIL_OUTBOX_LEASE_SECONDS'] = int(os.getenv('MAIL_OUTBOX_LEASE_SECONDS', '300'))
+    # Verlengingsherinneringen: aantal dagen voor de vervaldatum, en polissen per transactie
+    app.config['RENEWAL_REMINDER_DAYS'] = [int(d) for d in os.getenv('RENEWAL_REMINDER_DAYS', '60,30,7').split(',')]
+    app.config['RENEWAL_SCAN_BATCH_SIZE'] = int(os.getenv('RENEWAL_SCAN_BATCH_SIZE', '1000'))
+    # Live events (SSE): zonder broker blijven events binnen het proces; met meerdere workers
+    # een redis:// URL zodat elke worker alle events ziet. Een open stream houdt bij gthread
+    # workers een thread bezet, daarom een maximum per worker
+    app.config['EVENT_BROKER_URL'] = os.getenv('EVENT_BROKER_URL', '')
+    app.config['EVENT_BROKER_CHANNEL'] = os.getenv('EVENT_BROKER_CHANNEL', 'insurance-portal-events')
+    app.config['EVENTS_MAX_STREAMS'] = int(os.getenv('EVENTS_MAX_STREAMS', '2'))
+    app.config['EVENTS_QUEUE_SIZE'] = int(os.getenv('EVENTS_QUEUE_SIZE', '100'))
+    app.config['EVENTS_HEARTBEAT_SECONDS'] = int(os.getenv('EVENTS_HEARTBEAT_SECONDS', '15'))
+    # EventSource kan geen Authorization header sturen: de stream opent met een kortlevend
+    # ticket in de URL in plaats van het JWT (dat anders in access- en proxylogs belandt)
+    app.config['EVENTS_TICKET_SECONDS'] = int(os.getenv('EVENTS_TICKET_SECONDS', '30'))
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key-here')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    # Rol/naam uit het token gebruiken zonder lookup; rolwijzigingen gelden dan pas na een nieuw token
+    app.config['JWT_TRUST_ROLE_CLAIMS'] = os.getenv('JWT_TRUST_ROLE_CLAIMS', 'false').lower() == 'true'
+    app.config['IDENTITY_CACHE_SIZE'] = int(os.getenv('IDENTITY_CACHE_SIZE', '10000'))
+    app.config['IDENTITY_CACHE_TTL'] = int(os.getenv('IDENTITY_CACHE_TTL', '60'))
+    # Requests trager dan deze drempel (ms) worden gelogd met hun SQL; 0 = uit
+    app.config['SLOW_REQUEST_MS'] = int(os.getenv('SLOW_REQUEST_MS', '0'))
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN', '')
+    # Met meerdere workers: map waarin elke worker zijn tellers schrijft, zodat /metrics het
+    # totaal van alle workers geeft (gunicorn.conf.py zet hem); leeg = alleen dit proces
+    app.config['METRICS_DIR'] = os.getenv('METRICS_DIR', '')
+    app.config['METRICS_FLUSH_SECONDS'] = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+    app.config['JSON_PROVIDER'] = os.getenv('JSON_PROVIDER', 'orjson' if orjson else 'default')
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', '6'))
+    app.config['BULK_CHUNK_SIZE'] = int(os.getenv('BULK_CHUNK_SIZE', '1000'))
+    app.config['BULK_MAX_REPORTED_ERRORS'] = int(os.getenv('BULK_MAX_REPORTED_ERRORS', '1000'))
+    # Afspraken: een maximale duur maakt overlap-queries op de (user_id, datum) index begrensd
+    app.config['APPOINTMENT_MAX_MINUTES'] = int(os.getenv('APPOINTMENT_MAX_MINUTES', '480'))
+    app.config['APPOINTMENT_MAX_RANGE_DAYS'] = int(os.getenv('APPOINTMENT_MAX_RANGE_DAYS', '93'))
+    # /api/dashboard: na dit aantal ms worden geen nieuwe secties meer gestart
+    app.config['DASHBOARD_BUDGET_MS'] = int(os.getenv('DASHBOARD_BUDGET_MS', '500'))
+    # Change feed (/api/changes): entries ouder dan de bewaartermijn worden door
+    # compact_change_log.py verwijderd; clients met een oudere cursor moeten opnieuw laden
+    app.config['CHANGE_LOG_RETENTION_DAYS'] = int(os.getenv('CHANGE_LOG_RETENTION_DAYS', '30'))
+    app.config['CHANGE_LOG_COMPACTION_BATCH_SIZE'] = int(os.getenv('CHANGE_LOG_COMPACTION_BATCH_SIZE', '10000'))
+    # Wachtwoord hashing: werkfactor in Werkzeug notatie, en een begrensde pool zodat een
+    # piek aan logins niet alle request workers en CPU opeist
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+    app.config['PASSWORD_HASH_QUEUE'] = int(os.getenv('PASSWORD_HASH_QUEUE', '32'))
+
+def configure_sqlite_engine(engine, pragmas):
+    """Zet de opgegeven PRAGMA's op elke verbinding die de engine opent."""
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+def iso_datetime(value):
+    return value.isoformat() if value is not None else None
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """Standaard provider, maar datums als ISO 8601 in plaats van HTTP datum."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+class OrjsonProvider(IsoJSONProvider):
+    """JSON via orjson; serialiseert datetimes zelf als ISO 8601."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+JSON_PROVIDERS = {'default': IsoJSONProvider, 'orjson': OrjsonProvider}
 
 # Models
 class Appointment(db.Model):
     __tablename__ = 'appointments'
+    __table_args__ = (
+        db.Index('ix_appointments_user_id_datum', 'user_id', 'datum'),
+        db.Index('ix_appointments_datum', 'datum'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     datum = db.Column(db.DateTime, nullable=False)
     onderwerp = db.Column(db.String(100), nullable=False)
     status = db.Column(db.String(20), nullable=False, default='open')
     notities = db.Column(db.Text)
+    duur = db.Column(db.Integer, nullable=False, default=60, server_default='60')  # minuten
+
+    @property
+    def eind(self):
+        return self.datum + timedelta(minutes=self.duur or 60)
+
+    def to_dict(self, user_name=None):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'user_name': user_name,
+            'onderwerp': self.onderwerp,
+            'notities': self.notities,
+            'status': self.status,
+            'start': iso_datetime(self.datum),
+            'end': iso_datetime(self.eind),
+        }
 
 class ContactMessage(db.Model):
     __tablename__ = 'contact_messages'
+    __table_args__ = (db.Index('ix_contact_messages_created_at', 'created_at'),)
     id = db.Column(db.Integer, primary_key=True)
     naam = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), nullable=False)
@@ -79,7 +229,7 @@ class ContactMessage(db.Model):
             'onderwerp': self.onderwerp,
             'bericht': self.bericht,
             'voorkeur_contact': self.voorkeur_contact,
-            'created_at': self.created_at
+            'created_at': iso_datetime(self.created_at)
         }
 
 class User(db.Model):
@@ -93,28 +243,56 @@ class User(db.Model):
     def __repr__(self):
         return f'<User {self.email}>'
     def set_password(self, password):
-        self.password = generate_password_hash(password, method='sha256')
+        self.password = password_hasher.hash(password)
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
 
 class Claim(db.Model):
     __tablename__ = 'claims'
+    __table_args__ = (
+        db.Index('ix_claims_user_id', 'user_id'),
+        db.Index('ix_claims_policy_id', 'policy_id'),
+        db.Index('ix_claims_status', 'status'),
+        db.Index('ix_claims_document_hash', 'document_hash'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     policy_id = db.Column(db.Integer, db.ForeignKey('policies.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.String(20), nullable=False, default='pending')
     document_url = db.Column(db.String(200))
+    document_hash = db.Column(db.String(64))
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'policy_id': self.policy_id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'document_url': self.document_url
+        }
+
+class Document(db.Model):
+    __tablename__ = 'documents'
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (db.Index('ix_payments_policy_id', 'policy_id'),)
     id = db.Column(db.Integer, primary_key=True)
     policy_id = db.Column(db.Integer, db.ForeignKey('policies.id'), nullable=False)
     status = db.Column(db.String(20), nullable=False, default='pending')
     bedrag = db.Column(db.Float, nullable=False)
     betaaldatum = db.Column(db.DateTime)
+    vervaldatum = db.Column(db.DateTime)  # uiterste betaaldatum
 
 class Policy(db.Model):
     __tablename__ = 'policies'
+    __table_args__ = (
+        db.Index('ix_policies_user_id', 'user_id'),
+        db.Index('ix_policies_vervaldatum_id', 'vervaldatum', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     type = db.Column(db.String(50), nullable=False)
@@ -133,33 +311,1226 @@ class Policy(db.Model):
             'dekking': self.dekking,
             'premie': self.premie,
             'eigen_risico': self.eigen_risico,
-            'vervaldatum': self.vervaldatum,
+            'vervaldatum': iso_datetime(self.vervaldatum),
             'status': self.status,
             'beschrijving': self.beschrijving
         }
 
 
+class StatisticsRollup(db.Model):
+    __tablename__ = 'statistics_rollups'
+    __table_args__ = (db.UniqueConstraint('metric', 'bucket'),)
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(50), nullable=False)
+    bucket = db.Column(db.String(100), nullable=False)
+    value = db.Column(db.Float, nullable=False, default=0)
+
+class PolicyBalance(db.Model):
+    __tablename__ = 'policy_balances'
+    __table_args__ = (db.Index('ix_policy_balances_user_id', 'user_id'),)
+    policy_id = db.Column(db.Integer, db.ForeignKey('policies.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    due = db.Column(db.Float, nullable=False, default=0)
+    paid = db.Column(db.Float, nullable=False, default=0)
+    open_payments = db.Column(db.Integer, nullable=False, default=0)
+
+class ResourceVersion(db.Model):
+    __tablename__ = 'resource_versions'
+    key = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class MailOutbox(db.Model):
+    __tablename__ = 'mail_outbox'
+    __table_args__ = (db.Index('ix_mail_outbox_due', 'status', 'next_attempt_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    recipients = db.Column(db.Text, nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(36))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+class RenewalReminder(db.Model):
+    __tablename__ = 'renewal_reminders'
+    # Eén herinnering per polis, vervaldatum en venster; een verlengde polis krijgt weer nieuwe
+    __table_args__ = (db.UniqueConstraint('policy_id', 'vervaldatum', 'window_days'),)
+    id = db.Column(db.Integer, primary_key=True)
+    policy_id = db.Column(db.Integer, db.ForeignKey('policies.id'), nullable=False)
+    vervaldatum = db.Column(db.DateTime, nullable=False)
+    window_days = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class JobCheckpoint(db.Model):
+    __tablename__ = 'job_checkpoints'
+    name = db.Column(db.String(50), primary_key=True)
+    run = db.Column(db.String(50), nullable=False)
+    position = db.Column(db.JSON)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    queued = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+class ChangeLogEntry(db.Model):
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        db.Index('ix_change_log_user_id_id', 'user_id', 'id'),
+        db.Index('ix_change_log_created_at', 'created_at'),
+        # Cursors mogen na compactie nooit opnieuw uitgegeven worden
+        {'sqlite_autoincrement': True},
+    )
+    id = db.Column(db.Integer, primary_key=True)  # cursor voor /api/changes
+    resource = db.Column(db.String(30), nullable=False)
+    object_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(10), nullable=False)  # created, updated of deleted
+    user_id = db.Column(db.Integer)  # eigenaar; leeg = alleen zichtbaar voor admins
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+# Statistieken: rollups die bij elke flush incrementeel worden bijgewerkt
+ACTIVE_POLICY_STATUS = 'actief'
+OPEN_CLAIM_STATUS = 'pending'
+PAID_CLAIM_STATUS = 'approved'
+PAID_PAYMENT_STATUS = 'betaald'
+UNKNOWN_BUCKET = 'onbekend'
+CUSTOMER_ROLE = 'client'
+MONTH_LABELS = ['Jan', 'Feb', 'Mrt', 'Apr', 'Mei', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dec']
+
+def _month_bucket(dt):
+    return dt.strftime('%Y-%m')
+
+def _as_datetime(value):
+    """date() geeft op SQLite een string en op andere databases een date terug."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+def _day_bucket(dt):
+    return dt.strftime('%Y-%m-%d')
+
+def _quarter_bucket(dt):
+    return f'{dt.year}-Q{(dt.month - 1) // 3 + 1}'
+
+def _policy_contributions(values):
+    yield ('summary', 'total_policies', 1)
+    if values['status'] == ACTIVE_POLICY_STATUS:
+        yield ('summary', 'active_policies', 1)
+        yield ('summary', 'total_premium', values['premie'] or 0)
+
+def _claim_contributions(values, policy_types):
+    yield ('summary', 'total_claims', 1)
+    yield ('claims_by_type', policy_types.get(values['policy_id'], 'Onbekend'), 1)
+    if values['status'] == OPEN_CLAIM_STATUS:
+        yield ('summary', 'open_claims', 1)
+    elif values['status'] == PAID_CLAIM_STATUS:
+        yield ('summary', 'total_claims_paid', 1)
+
+def _payment_contributions(values, count=1):
+    # `count` > 1 als `values` een gegroepeerde rij is (bedrag is dan de som)
+    bedrag = values['bedrag'] or 0
+    if values['betaaldatum'] is not None:
+        yield ('monthly_premiums', _month_bucket(values['betaaldatum']), bedrag)
+        yield ('summary', 'total_premiums', bedrag)
+
+    # Grootboek: verschuldigd per vervalmaand, betaald per betaalmaand, openstaand per vervaldag
+    yield ('ledger', 'due', bedrag)
+    yield ('ledger', 'payments', count)
+    due_date = values['vervaldatum'] or values['betaaldatum']
+    if due_date is not None:
+        yield ('ledger_due', _month_bucket(due_date), bedrag)
+    if values['status'] == PAID_PAYMENT_STATUS:
+        yield ('ledger', 'paid', bedrag)
+        if values['betaaldatum'] is not None:
+            yield ('ledger_paid', _month_bucket(values['betaaldatum']), bedrag)
+    else:
+        bucket = _day_bucket(values['vervaldatum']) if values['vervaldatum'] else UNKNOWN_BUCKET
+        yield ('ledger', 'open_payments', count)
+        yield ('ledger_open', bucket, bedrag)
+        yield ('ledger_open_count', bucket, count)
+
+def _user_contributions(values):
+    yield ('summary', 'total_users', 1)
+    if values['role'] == CUSTOMER_ROLE:
+        yield ('summary', 'total_customers', 1)
+        yield ('customer_growth', _quarter_bucket(values['created_at'] or datetime.utcnow()), 1)
+
+ROLLUP_SOURCES = {
+    'Policy': ('status', 'premie'),
+    'Claim': ('status', 'policy_id'),
+    'Payment': ('policy_id', 'status', 'bedrag', 'betaaldatum', 'vervaldatum'),
+    'User': ('role', 'created_at'),
+}
+
+# Oude waarden moeten bij een wijziging beschikbaar zijn, ook als het object verlopen was
+def _keep_active_history(target, value, oldvalue, initiator):
+    pass
+
+for _model in (Policy, Claim, Payment, User):
+    for _attr in ROLLUP_SOURCES[_model.__name__]:
+        event.listen(getattr(_model, _attr), 'set', _keep_active_history, active_history=True)
+
+def _current_values(obj, attrs):
+    return {attr: getattr(obj, attr) for attr in attrs}
+
+def _previous_values(obj, attrs):
+    state = inspect(obj)
+    values = {}
+    for attr in attrs:
+        history = state.attrs[attr].history
+        values[attr] = history.deleted[0] if history.deleted else getattr(obj, attr)
+    return values
+
+def _contributions(obj, values, policy_types):
+    name = type(obj).__name__
+    if name == 'Policy':
+        return _policy_contributions(values)
+    if name == 'Claim':
+        return _claim_contributions(values, policy_types)
+    if name == 'Payment':
+        return _payment_contributions(values)
+    return _user_contributions(values)
+
+def upsert(connection, table):
+    """INSERT ... ON CONFLICT statement voor de dialect van `connection` (SQLite of PostgreSQL)."""
+    insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    return insert(table)
+
+def _apply_rollup_deltas(connection, deltas):
+    # Eén upsert: geen race tussen twee eerste schrijvers van een bucket, en rijen in
+    # gesorteerde volgorde zodat gelijktijdige transacties niet kruislings op elkaar wachten
+    rows = [
+        {'metric': metric, 'bucket': bucket, 'value': delta}
+        for (metric, bucket), delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+    table = StatisticsRollup.__table__
+    statement = upsert(connection, table)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.metric, table.c.bucket],
+        set_={'value': table.c.value + statement.excluded.value},
+    ), rows)
+
+def _rollup_changes(session, names=ROLLUP_SOURCES):
+    """(object, oude waarden, nieuwe waarden) voor elk gewijzigd object van de opgegeven modellen."""
+    changes = []
+    for obj in session.new:
+        if type(obj).__name__ in names:
+            changes.append((obj, None, _current_values(obj, ROLLUP_SOURCES[type(obj).__name__])))
+    for obj in session.deleted:
+        if type(obj).__name__ in names:
+            changes.append((obj, _current_values(obj, ROLLUP_SOURCES[type(obj).__name__]), None))
+    for obj in session.dirty:
+        if type(obj).__name__ in names and session.is_modified(obj, include_collections=False):
+            attrs = ROLLUP_SOURCES[type(obj).__name__]
+            changes.append((obj, _previous_values(obj, attrs), _current_values(obj, attrs)))
+    return changes
+
+@event.listens_for(db.session, 'after_flush')
+def _update_statistics_rollups(session, flush_context):
+    changes = _rollup_changes(session)
+    if not changes:
+        return
+
+    # Polistype van claims in één query ophalen
+    policy_ids = {
+        values['policy_id']
+        for obj, old, new in changes if isinstance(obj, Claim)
+        for values in (old, new) if values
+    }
+    policy_types = {}
+    if policy_ids:
+        rows = session.connection().execute(
+            db.select(Policy.id, Policy.type).where(Policy.id.in_(policy_ids))
+        )
+        policy_types = dict(rows.all())
+
+    deltas = {}
+    for obj, old, new in changes:
+        if old:
+            for metric, bucket, amount in _contributions(obj, old, policy_types):
+                deltas[(metric, bucket)] = deltas.get((metric, bucket), 0) - amount
+        if new:
+            for metric, bucket, amount in _contributions(obj, new, policy_types):
+                deltas[(metric, bucket)] = deltas.get((metric, bucket), 0) + amount
+    _apply_rollup_deltas(session.connection(), deltas)
+
+# Saldo per polis: verschuldigd, betaald en aantal open betalingen, bij elke flush bijgewerkt
+def _balance_contribution(values):
+    bedrag = values['bedrag'] or 0
+    if values['status'] == PAID_PAYMENT_STATUS:
+        return bedrag, bedrag, 0
+    return bedrag, 0, 1
+
+def _apply_balance_deltas(connection, deltas):
+    # Upsert in polis-volgorde, net als _apply_rollup_deltas
+    changed = {policy_id: delta for policy_id, delta in sorted(deltas.items()) if any(delta)}
+    if not changed:
+        return
+    owners = dict(connection.execute(
+        db.select(Policy.id, Policy.user_id).where(Policy.id.in_(changed))
+    ).all())
+    table = PolicyBalance.__table__
+    rows = []
+    for policy_id, (due, paid, open_payments) in changed.items():
+        if policy_id in owners:
+            rows.append({'policy_id': policy_id, 'user_id': owners[policy_id], 'due': due, 'paid': paid,
+                         'open_payments': open_payments})
+        else:
+            # Polis is in deze flush verwijderd: alleen een bestaand saldo bijwerken
+            connection.execute(
+                table.update()
+                .where(table.c.policy_id == policy_id)
+                .values(due=table.c.due + due, paid=table.c.paid + paid,
+                        open_payments=table.c.open_payments + open_payments)
+            )
+    if not rows:
+        return
+    statement = upsert(connection, table)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.policy_id],
+        set_={
+            'due': table.c.due + statement.excluded.due,
+            'paid': table.c.paid + statement.excluded.paid,
+            'open_payments': table.c.open_payments + statement.excluded.open_payments,
+        },
+    ), rows)
+
+@event.listens_for(db.session, 'after_flush')
+def _update_policy_balances(session, flush_context):
+    deltas = {}
+    for obj, old, new in _rollup_changes(session, ('Payment',)):
+        for values, sign in ((old, -1), (new, 1)):
+            if values and values['policy_id'] is not None:
+                current = deltas.get(values['policy_id'], (0, 0, 0))
+                deltas[values['policy_id']] = tuple(
+                    total + sign * amount for total, amount in zip(current, _balance_contribution(values))
+                )
+    if deltas:
+        _apply_balance_deltas(session.connection(), deltas)
+
+def rebuild_policy_balances():
+    """Bouw alle polissaldi opnieuw op met één geaggregeerde INSERT ... SELECT (niet gecommit)."""
+    paid = Payment.status == PAID_PAYMENT_STATUS
+    db.session.execute(PolicyBalance.__table__.delete())
+    db.session.execute(PolicyBalance.__table__.insert().from_select(
+        ['policy_id', 'user_id', 'due', 'paid', 'open_payments'],
+        db.select(
+            Payment.policy_id,
+            Policy.user_id,
+            func.sum(Payment.bedrag),
+            func.coalesce(func.sum(Payment.bedrag).filter(paid), 0),
+            func.count(Payment.id).filter(~paid),
+        )
+        .join(Policy, Policy.id == Payment.policy_id)
+        .group_by(Payment.policy_id, Policy.user_id)
+    ))
+
+def rebuild_statistics():
+    """Herbereken alle rollups vanuit de brontabellen (binnen een app context aanroepen)."""
+    deltas = {}
+
+    def add(metric, bucket, amount):
+        deltas[(metric, bucket)] = deltas.get((metric, bucket), 0) + amount
+
+    policy_count, active_count, active_premium = db.session.query(
+        func.count(Policy.id),
+        func.count(Policy.id).filter(Policy.status == ACTIVE_POLICY_STATUS),
+        func.coalesce(func.sum(Policy.premie).filter(Policy.status == ACTIVE_POLICY_STATUS), 0),
+    ).one()
+    add('summary', 'total_policies', policy_count)
+    add('summary', 'active_policies', active_count)
+    add('summary', 'total_premium', active_premium)
+
+    for policy_type, status, count in (
+        db.session.query(Policy.type, Claim.status, func.count(Claim.id))
+        .outerjoin(Policy, Claim.policy_id == Policy.id)
+        .group_by(Policy.type, Claim.status)
+    ):
+        add('summary', 'total_claims', count)
+        add('claims_by_type', policy_type or 'Onbekend', count)
+        if status == OPEN_CLAIM_STATUS:
+            add('summary', 'open_claims', count)
+        elif status == PAID_CLAIM_STATUS:
+            add('summary', 'total_claims_paid', count)
+
+    # Betalingen per status en dag in SQL optellen (enkele duizenden groepen in plaats van
+    # miljoenen rijen); de buckets zelf worden in Python bepaald zodat dit op elke database werkt
+    payments = db.session.query(
+        Payment.status, func.date(Payment.betaaldatum), func.date(Payment.vervaldatum),
+        func.sum(Payment.bedrag), func.count(Payment.id),
+    ).group_by(Payment.status, func.date(Payment.betaaldatum), func.date(Payment.vervaldatum))
+    for status, betaaldatum, vervaldatum, bedrag, count in payments.yield_per(10000):
+        values = {
+            'status': status,
+            'bedrag': bedrag,
+            'betaaldatum': _as_datetime(betaaldatum),
+            'vervaldatum': _as_datetime(vervaldatum),
+        }
+        for metric, bucket, amount in _payment_contributions(values, count):
+            add(metric, bucket, amount)
+
+    for role, created_at in db.session.query(User.role, User.created_at).yield_per(10000):
+        for metric, bucket, amount in _user_contributions({'role': role, 'created_at': created_at}):
+            add(metric, bucket, amount)
+
+    StatisticsRollup.query.delete()
+    db.session.bulk_insert_mappings(StatisticsRollup, [
+        {'metric': metric, 'bucket': bucket, 'value': value}
+        for (metric, bucket), value in deltas.items()
+    ])
+    rebuild_policy_balances()
+    db.session.commit()
+
+# Resource versies: per resource en eigenaar een teller die bij elke schrijfactie
+# wordt opgehoogd; lijst endpoints gebruiken die als ETag (conditional GET)
+GLOBAL_VERSION_KEY = 'global'
+VERSIONED_RESOURCES = {
+    'Policy': 'policies',
+    'Claim': 'claims',
+    'Appointment': 'appointments',
+    'ContactMessage': 'contact',
+    'User': 'users',
+}
+
+def _version_keys(obj):
+    resource = VERSIONED_RESOURCES[type(obj).__name__]
+    keys = {f'{resource}:*'}
+    owner = getattr(obj, 'user_id', None)
+    if owner is not None:
+        keys.add(f'{resource}:{owner}')
+        history = inspect(obj).attrs.user_id.history
+        keys.update(f'{resource}:{old}' for old in history.deleted if old is not None)
+    return keys
+
+def bump_resource_versions(connection, keys):
+    table = ResourceVersion.__table__
+    for key in keys:
+        result = connection.execute(
+            table.update().where(table.c.key == key).values(version=table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(key=key, version=1))
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_changed_resources(session, flush_context):
+    keys = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if type(obj).__name__ in VERSIONED_RESOURCES:
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            keys |= _version_keys(obj)
+    if keys:
+        bump_resource_versions(session.connection(), sorted(keys))
+
+# Change feed: elke schrijfactie op deze modellen komt in dezelfde transactie in de
+# change log, met de eigenaar zodat /api/changes per gebruiker kan filteren
+CHANGE_FEED_RESOURCES = {
+    'Policy': 'policies',
+    'Claim': 'claims',
+    'Payment': 'payments',
+    'Appointment': 'appointments',
+    'ContactMessage': 'contact',
+}
+
+# Lezers pagineren op id > cursor, dus ids moeten in volgorde zichtbaar worden. SQLite heeft
+# één schrijver; op PostgreSQL houdt een advisory lock schrijvers van de change log op
+# volgorde, anders kan een later gecommitte lagere id achter een cursor vallen. De entries
+# worden pas vlak voor de commit geschreven (_write_changes), zodat de lock alleen het
+# toekennen van ids en de commit zelf omvat en niet de rest van de transactie. Kosten:
+# commits met change log entries lopen database-breed na elkaar, ongeveer één commit
+# (inclusief fsync) per keer; transacties zonder change feed modellen nemen de lock niet
+CHANGE_LOG_LOCK_KEY = 7261001
+
+def _change_owner_attr(obj):
+    # Betalingen horen bij de eigenaar van hun polis; contactberichten hebben geen eigenaar
+    if isinstance(obj, Payment):
+        return 'policy_id'
+    return 'user_id' if hasattr(obj, 'user_id') else None
+
+# De vorige eigenaar is nodig om een verplaatst object bij die eigenaar als verwijderd te melden
+for _model in (Policy, Claim, Appointment):
+    event.listen(_model.user_id, 'set', _keep_active_history, active_history=True)
+
+@event.listens_for(db.session, 'after_flush')
+def _record_changes(session, flush_context):
+    changes = []
+    for action, objs in (('created', session.new), ('updated', session.dirty), ('deleted', session.deleted)):
+        for obj in objs:
+            resource = CHANGE_FEED_RESOURCES.get(type(obj).__name__)
+            if resource is None:
+                continue
+            if action == 'updated' and not session.is_modified(obj, include_collections=False):
+                continue
+            attr = _change_owner_attr(obj)
+            owner = getattr(obj, attr) if attr else None
+            if action == 'updated' and attr:
+                # Naar een andere eigenaar verplaatst: voor de oude eigenaar is het object weg
+                for old in inspect(obj).attrs[attr].history.deleted:
+                    if old is not None and old != owner:
+                        changes.append((resource, obj.id, 'deleted', attr, old))
+            changes.append((resource, obj.id, action, attr, owner))
+    if not changes:
+        return
+
+    policy_ids = {value for _, _, _, attr, value in changes if attr == 'policy_id' and value is not None}
+    # Polissen uit deze flush eerst uit de sessie: een verwijderde polis staat niet meer in de database
+    policy_owners = {
+        obj.id: obj.user_id for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, Policy) and obj.id in policy_ids
+    }
+    missing = policy_ids - policy_owners.keys()
+    if missing:
+        policy_owners.update(session.execute(
+            db.select(Policy.id, Policy.user_id).where(Policy.id.in_(missing))
+        ).all())
+    now = datetime.utcnow()
+    session.info.setdefault('change_log_rows', []).extend(
+        {
+            'resource': resource,
+            'object_id': object_id,
+            'action': action,
+            'user_id': policy_owners.get(owner) if attr == 'policy_id' else owner,
+            'created_at': now,
+        }
+        for resource, object_id, action, attr, owner in changes
+    )
+
+@event.listens_for(db.session, 'before_commit')
+def _write_changes(session):
+    # Ook bij het vrijgeven van een savepoint; de entries wachten dan op de buitenste commit
+    if session.in_nested_transaction():
+        return
+    session.flush()  # commit flusht pas na before_commit, de laatste wijzigingen moeten mee
+    rows = session.info.pop('change_log_rows', None)
+    if not rows:
+        return
+    connection = session.connection()
+    if connection.dialect.name == 'postgresql':
+        connection.execute(db.select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK_KEY)))
+    connection.execute(ChangeLogEntry.__table__.insert(), rows)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('change_log_rows', None)
+
+def resource_etag(resource, owner='*', related=(), scope=''):
+    """ETag voor de lijst `resource` van `owner` ('*' = alles), afhankelijk van caller en query.
+
+    `related` zijn versie-sleutels van andere resources die in de response zitten (bijvoorbeeld
+    'users:*' voor namen), `scope` wat de server zelf invult, zoals een standaardperiode.
+    """
+    table = ResourceVersion.__table__
+    key = f'{resource}:{owner}'
+    rows = dict(db.session.execute(
+        db.select(table.c.key, table.c.version).where(table.c.key.in_([key, GLOBAL_VERSION_KEY, *related]))
+    ).all())
+    user = current_user_identity()
+    related_state = ','.join(f'{name}={rows.get(name, 0)}' for name in related)
+    variant = (f'{user.id if user else "-"}:{user.role if user else "-"}:{request.query_string.decode()}'
+               f':{scope}:{related_state}')
+    digest = uuid.uuid5(uuid.NAMESPACE_URL, variant).hex[:16]
+    return f'{key}-{rows.get(key, 0)}-{rows.get(GLOBAL_VERSION_KEY, 0)}-{digest}'
+
+def not_modified(etag):
+    """Geeft een 304 response als de client deze versie al heeft, anders None."""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        return with_etag(response, etag)
+    return None
+
+def with_etag(response, etag):
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+# Mail outbox: mails worden in dezelfde transactie als de data opgeslagen
+# en later door een worker pool verstuurd (zie mail_worker.py)
+def queue_mail(subject, recipients, body):
+    """Voeg een mail toe aan de outbox; wordt verstuurd zodra de sessie commit."""
+    item = MailOutbox(subject=subject, recipients=','.join(recipients), body=body)
+    db.session.add(item)
+    return item
+
+def _claim_outbox_batch(batch_size):
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config['MAIL_OUTBOX_LEASE_SECONDS'])
+    claimable = db.or_(
+        db.and_(MailOutbox.status == 'pending', MailOutbox.next_attempt_at <= now),
+        db.and_(MailOutbox.status == 'sending', MailOutbox.locked_at < stale),
+    )
+    due = db.select(MailOutbox.id).where(claimable).order_by(MailOutbox.id).limit(batch_size)
+    token = str(uuid.uuid4())
+    db.session.execute(
+        db.update(MailOutbox)
+        .where(MailOutbox.id.in_(due), claimable)
+        .values(status='sending', locked_by=token, locked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return MailOutbox.query.filter_by(locked_by=token, status='sending').order_by(MailOutbox.id).all()
+
+def _close_mail_connection(connection):
+    try:
+        connection.__exit__(None, None, None)
+    except Exception:
+        pass
+
+def _send_outbox_batch(items):
+    """Verstuur een batch over één SMTP verbinding; geeft per item een foutmelding of None."""
+    errors = {}
+    connection = None
+    for item in items:
+        try:
+            if connection is None:
+                connection = mail.connect().__enter__()
+            connection.send(Message(
+                subject=item.subject,
+                recipients=item.recipients.split(','),
+                body=item.body
+            ))
+            errors[item.id] = None
+        except Exception as e:
+            errors[item.id] = str(e) or type(e).__name__
+            # Na een fout is de verbinding mogelijk onbruikbaar; volgende mail opent een nieuwe
+            if connection is not None:
+                _close_mail_connection(connection)
+                connection = None
+    if connection is not None:
+        _close_mail_connection(connection)
+    return errors
+
+def process_mail_outbox(batch_size=None):
+    """Claim en verstuur één batch uit de outbox; geeft het aantal verwerkte mails terug."""
+    items = _claim_outbox_batch(batch_size or current_app.config['MAIL_OUTBOX_BATCH_SIZE'])
+    if not items:
+        return 0
+    errors = _send_outbox_batch(items)
+    now = datetime.utcnow()
+    for item in items:
+        error = errors.get(item.id)
+        item.locked_by = None
+        item.locked_at = None
+        item.attempts += 1
+        if error is None:
+            item.status = 'sent'
+            item.sent_at = now
+            item.last_error = None
+        elif item.attempts >= current_app.config['MAIL_OUTBOX_MAX_ATTEMPTS']:
+            item.status = 'failed'
+            item.last_error = error
+        else:
+            # Exponentiële backoff, maximaal een uur
+            delay = min(current_app.config['MAIL_OUTBOX_RETRY_SECONDS'] * 2 ** (item.attempts - 1), 3600)
+            item.status = 'pending'
+            item.next_attempt_at = now + timedelta(seconds=delay)
+            item.last_error = error
+    db.session.commit()
+    return len(items)
+
+def _mail_worker_loop(app, stop_event, batch_size, poll_interval):
+    with app.app_context():
+        while not stop_event.is_set():
+            try:
+                processed = process_mail_outbox(batch_size)
+            except Exception:
+                app.logger.exception('Error in mail worker')
+                db.session.rollback()
+                processed = 0
+            finally:
+                db.session.remove()
+            if not processed:
+                stop_event.wait(poll_interval)
+
+def start_mail_workers(app, workers=2, batch_size=None, poll_interval=2.0):
+    """Start een pool van worker threads; zet het teruggegeven event om ze te stoppen."""
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(
+            target=_mail_worker_loop,
+            args=(app, stop_event, batch_size, poll_interval),
+            name=f'mail-worker-{i}',
+            daemon=True
+        )
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    return stop_event, threads
+
+# Verlengingsherinneringen: nachtelijke scan over polissen die binnen een venster verlopen.
+# Per batch worden herinneringen, outbox mails en het checkpoint in één transactie
+# geschreven; een herstart gaat verder na de laatst verwerkte polis.
+RENEWAL_JOB = 'renewal_reminders'
+
+def _renewal_mail(row, today):
+    days = (row.vervaldatum.date() - today).days
+    return {
+        'subject': f'Uw {row.type} verloopt op {row.vervaldatum:%d-%m-%Y}',
+        'recipients': row.email,
+        'body': (
+            f'Beste {row.name},\n\n'
+            f'Uw {row.type} (polisnummer {row.id}) verloopt over {days} dagen, op {row.vervaldatum:%d-%m-%Y}.\n'
+            'Neem contact met ons op om uw polis te verlengen of uw dekking te bespreken.\n\n'
+            'Met vriendelijke groet,\nRisk Pro Actief'
+        ),
+    }
+
+def _renewal_checkpoint(run, restart):
+    checkpoint = db.session.get(JobCheckpoint, RENEWAL_JOB)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=RENEWAL_JOB, run=run)
+        db.session.add(checkpoint)
+    elif restart or checkpoint.run != run:
+        checkpoint.run = run
+        checkpoint.position = None
+        checkpoint.processed = 0
+        checkpoint.queued = 0
+        checkpoint.started_at = datetime.utcnow()
+        checkpoint.finished_at = None
+    db.session.commit()
+    return checkpoint
+
+def scan_expiring_policies(today=None, windows=None, batch_size=None, restart=False):
+    """Zet verlengingsherinneringen in de outbox voor actieve polissen die binnen een venster verlopen.
+
+    Idempotent: al verstuurde herinneringen worden overgeslagen, en een afgebroken run van
+    dezelfde dag gaat verder vanaf het checkpoint. Geeft het checkpoint terug.
+    """
+    today = today or datetime.utcnow().date()
+    windows = sorted(windows or current_app.config['RENEWAL_REMINDER_DAYS'])
+    batch_size = batch_size or current_app.config['RENEWAL_SCAN_BATCH_SIZE']
+    start = datetime.combine(today, datetime.min.time())
+    horizon = start + timedelta(days=windows[-1] + 1)
+
+    checkpoint = _renewal_checkpoint(today.isoformat(), restart)
+    if checkpoint.finished_at is not None:
+        return checkpoint
+
+    # Keyset op (vervaldatum, id) over de index: alleen polissen binnen de horizon worden gelezen
+    base = (
+        db.select(Policy.id, Policy.type, Policy.vervaldatum, User.email, User.name)
+        .join(User, User.id == Policy.user_id)
+        .where(Policy.status == ACTIVE_POLICY_STATUS, Policy.vervaldatum >= start, Policy.vervaldatum < horizon)
+        .order_by(Policy.vervaldatum, Policy.id)
+        .limit(batch_size)
+    )
+    while True:
+        query = base
+        if checkpoint.position:
+            after = (datetime.fromisoformat(checkpoint.position['vervaldatum']), checkpoint.position['id'])
+            query = query.where(db.tuple_(Policy.vervaldatum, Policy.id) > after)
+        rows = db.session.execute(query).all()
+        if not rows:
+            break
+
+        # Per polis alleen het kleinste venster waar hij in valt; eerder gemiste vensters vervallen
+        candidates = {}
+        for row in rows:
+            days = (row.vervaldatum.date() - today).days
+            window = next(w for w in windows if days <= w)
+            candidates[(row.id, row.vervaldatum, window)] = row
+        sent = set(db.session.execute(
+            db.select(RenewalReminder.policy_id, RenewalReminder.vervaldatum, RenewalReminder.window_days)
+            .where(RenewalReminder.policy_id.in_([row.id for row in rows]))
+        ).all())
+        new = [(key, row) for key, row in candidates.items() if key not in sent]
+        if new:
+            db.session.execute(MailOutbox.__table__.insert(), [_renewal_mail(row, today) for _, row in new])
+            db.session.execute(RenewalReminder.__table__.insert(), [
+                {'policy_id': policy_id, 'vervaldatum': vervaldatum, 'window_days': window}
+                for (policy_id, vervaldatum, window), _ in new
+            ])
+
+        last = rows[-1]
+        checkpoint.position = {'vervaldatum': last.vervaldatum.isoformat(), 'id': last.id}
+        checkpoint.processed += len(rows)
+        checkpoint.queued += len(new)
+        checkpoint.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    checkpoint.finished_at = datetime.utcnow()
+    db.session.commit()
+    return checkpoint
+
+# Change log compactie: entries ouder dan de bewaartermijn worden in batches verwijderd.
+# De hoogste verwijderde id wordt eerst vastgelegd, zodat /api/changes een te oude
+# cursor herkent (410) in plaats van stilzwijgend wijzigingen over te slaan.
+CHANGE_LOG_COMPACTION_JOB = 'change_log_compaction'
+
+def change_log_horizon():
+    """Hoogste cursor die door compactie is verwijderd (0 als er nog niets verwijderd is)."""
+    position = db.session.execute(
+        db.select(JobCheckpoint.position).where(JobCheckpoint.name == CHANGE_LOG_COMPACTION_JOB)
+    ).scalar()
+    return (position or {}).get('compacted_through', 0)
+
+def compact_change_log(retention_days=None, batch_size=None, now=None):
+    """Verwijder change log entries ouder dan de bewaartermijn; geeft het aantal verwijderde entries."""
+    retention_days = current_app.config['CHANGE_LOG_RETENTION_DAYS'] if retention_days is None else retention_days
+    batch_size = batch_size or current_app.config['CHANGE_LOG_COMPACTION_BATCH_SIZE']
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=retention_days)
+    horizon = db.session.execute(
+        db.select(func.max(ChangeLogEntry.id)).where(ChangeLogEntry.created_at < cutoff)
+    ).scalar()
+    if horizon is None:
+        return 0
+
+    checkpoint = db.session.get(JobCheckpoint, CHANGE_LOG_COMPACTION_JOB)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=CHANGE_LOG_COMPACTION_JOB, run=now.date().isoformat(), position={})
+        db.session.add(checkpoint)
+    checkpoint.run = now.date().isoformat()
+    checkpoint.position = {'compacted_through': max(horizon, (checkpoint.position or {}).get('compacted_through', 0))}
+    checkpoint.started_at = checkpoint.updated_at = now
+    checkpoint.finished_at = None
+    db.session.commit()
+
+    # Korte transacties, zodat schrijvers (die ook in de change log schrijven) niet lang wachten
+    table = ChangeLogEntry.__table__
+    deleted = 0
+    while True:
+        batch = db.select(table.c.id).where(table.c.id <= horizon).order_by(table.c.id).limit(batch_size)
+        result = db.session.execute(table.delete().where(table.c.id.in_(batch.scalar_subquery())))
+        checkpoint.processed += result.rowcount
+        checkpoint.updated_at = datetime.utcnow()
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    checkpoint.finished_at = datetime.utcnow()
+    db.session.commit()
+    return deleted
+
+# Schema migraties: create_all maakt alleen ontbrekende tabellen aan, wijzigingen aan
+# bestaande databases gaan via genummerde migraties (idempotente SQL)
+MIGRATIONS = [
+    (1, 'Secundaire indexen op filter- en sorteerkolommen', [
+        'CREATE INDEX IF NOT EXISTS ix_policies_user_id ON policies (user_id)',
+        'CREATE INDEX IF NOT EXISTS ix_claims_user_id ON claims (user_id)',
+        'CREATE INDEX IF NOT EXISTS ix_claims_policy_id ON claims (policy_id)',
+        'CREATE INDEX IF NOT EXISTS ix_claims_status ON claims (status)',
+        'CREATE INDEX IF NOT EXISTS ix_payments_policy_id ON payments (policy_id)',
+        'CREATE INDEX IF NOT EXISTS ix_appointments_user_id_datum ON appointments (user_id, datum)',
+        'CREATE INDEX IF NOT EXISTS ix_appointments_datum ON appointments (datum)',
+        'CREATE INDEX IF NOT EXISTS ix_contact_messages_created_at ON contact_messages (created_at)',
+    ]),
+    (2, 'Content-addressed claim documenten', [
+        lambda connection: _add_column(connection, 'claims', 'document_hash', 'VARCHAR(64)'),
+        'CREATE INDEX IF NOT EXISTS ix_claims_document_hash ON claims (document_hash)',
+    ]),
+    (3, 'FTS5 zoekindex op contactberichten', [
+        lambda connection: _create_contact_search_index(connection),
+    ]),
+    (4, 'Duur van afspraken', [
+        lambda connection: _add_column(connection, 'appointments', 'duur', 'INTEGER NOT NULL DEFAULT 60'),
+    ]),
+    # Bestaande databases daarna eenmalig `python rebuild_statistics.py` (grootboek en polissaldi)
+    (5, 'Vervaldatum van betalingen', [
+        lambda connection: _add_column(connection, 'payments', 'vervaldatum', 'DATETIME'),
+    ]),
+    (6, 'Index voor de verloopscan', [
+        'CREATE INDEX IF NOT EXISTS ix_policies_vervaldatum_id ON policies (vervaldatum, id)',
+    ]),
+]
+
+def _add_column(connection, table, column, ddl):
+    columns = {c['name'] for c in inspect(connection).get_columns(table)}
+    if column not in columns:
+        connection.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+CONTACT_SEARCH_TABLE = 'contact_messages_fts'
+CONTACT_SEARCH_COLUMNS = ('naam', 'email', 'onderwerp', 'bericht')
+
+def _create_contact_search_index(connection):
+    """External-content FTS5 tabel; triggers houden hem bij voor elke insert, ook core/bulk inserts."""
+    if connection.dialect.name != 'sqlite':
+        return
+    columns = ', '.join(CONTACT_SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{c}' for c in CONTACT_SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{c}' for c in CONTACT_SEARCH_COLUMNS)
+    delete = (f"INSERT INTO {CONTACT_SEARCH_TABLE} ({CONTACT_SEARCH_TABLE}, rowid, {columns}) "
+              f"VALUES ('delete', old.id, {old_values});")
+    insert = f'INSERT INTO {CONTACT_SEARCH_TABLE} (rowid, {columns}) VALUES (new.id, {new_values});'
+    for statement in (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {CONTACT_SEARCH_TABLE} USING fts5({columns}, "
+        f"content='contact_messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f'CREATE TRIGGER IF NOT EXISTS contact_messages_ai AFTER INSERT ON contact_messages BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS contact_messages_ad AFTER DELETE ON contact_messages BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS contact_messages_au AFTER UPDATE ON contact_messages BEGIN {delete} {insert} END',
+        # Bestaande berichten eenmalig indexeren
+        f"INSERT INTO {CONTACT_SEARCH_TABLE} ({CONTACT_SEARCH_TABLE}) VALUES ('rebuild')",
+    ):
+        connection.execute(db.text(statement))
 
-# Automatisch tabellen aanmaken bij startup (voor Render gratis versie)
-with app.app_context():
+schema_migrations = db.Table(
+    'schema_migrations',
+    db.Column('version', db.Integer, primary_key=True),
+    db.Column('description', db.String(200), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False),
+)
+
+def run_migrations(engine):
+    """Voer openstaande migraties uit, elk in een eigen transactie; geeft de toegepaste versies terug."""
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        applied = set(connection.execute(db.select(schema_migrations.c.version)).scalars())
+    done = []
+    for version, description, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            with engine.begin() as connection:
+                for statement in statements:
+                    if callable(statement):
+                        statement(connection)
+                    else:
+                        connection.execute(db.text(statement))
+                connection.execute(schema_migrations.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            # Een andere worker heeft deze migratie al uitgevoerd
+            continue
+        done.append(version)
+    return done
+
+def prepare_database():
+    """Maak ontbrekende tabellen aan en voer openstaande migraties uit (binnen een app context)."""
     db.create_all()
+    return run_migrations(db.engine)
 
+# Identiteit: één plek om de ingelogde gebruiker en rol te bepalen
+UserIdentity = namedtuple('UserIdentity', ['id', 'email', 'name', 'role'])
 
+class TTLCache:
+    """Thread-safe LRU cache met een maximale leeftijd per item."""
 
-    def __repr__(self):
-        return f'<User {self.email}>'
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
 
-    def set_password(self, password):
-        self.password = generate_password_hash(password, method='sha256')
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
 
-    def check_password(self, password):
-        return check_password_hash(self.password, password)
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+identity_cache = TTLCache(maxsize=10000, ttl=60)  # grootte en TTL worden in create_app ingesteld
+
+def _user_identity(user):
+    return UserIdentity(user.id, user.email, user.name, user.role)
+
+def load_user_identity(user_id):
+    """Haal een gebruiker uit de cache, of uit de database bij een cache miss."""
+    # Invalidaties van andere workers komen via de event broker binnen (zie EventHub.dispatch)
+    events.broker.start()
+    identity = identity_cache.get(user_id)
+    if identity is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        identity = _user_identity(user)
+        identity_cache.set(user_id, identity)
+    return identity
+
+def current_user_identity():
+    """Geef de UserIdentity van de ingelogde gebruiker, of None (binnen @jwt_required)."""
+    current_user = get_jwt_identity()
+    if isinstance(current_user, dict):
+        current_user = current_user.get('user_id')
+    try:
+        user_id = int(current_user)
+    except (TypeError, ValueError):
+        return None
+    if current_app.config['JWT_TRUST_ROLE_CLAIMS']:
+        claims = get_jwt()
+        if 'role' in claims:
+            return UserIdentity(user_id, claims.get('email'), claims.get('name'), claims['role'])
+    return load_user_identity(user_id)
+
+# Gewijzigde of verwijderde gebruikers uit de cache halen, ook na de commit zodat
+# een gelijktijdige request geen oude waarde terugzet. Andere workers horen het via de
+# event broker (EVENT_BROKER_URL); zonder broker zien zij de wijziging pas na
+# IDENTITY_CACHE_TTL seconden
+USERS_CHANGED_EVENT = 'users.changed'
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('changed_user_ids', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+            identity_cache.pop(obj.id)
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_changed_users(session):
+    changed = session.info.pop('changed_user_ids', ())
+    for user_id in changed:
+        identity_cache.pop(user_id)
+    if changed:
+        # Geen rollen of eigenaar: dit event gaat naar geen enkele stream
+        events.publish(USERS_CHANGED_EVENT, {'ids': sorted(changed)}, roles=())
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)
+
+# Wachtwoorden: hashen en controleren gebeurt in een begrensde thread pool. hashlib geeft
+# de GIL vrij, dus andere requests lopen door; bij een te lange wachtrij volgt een 503
+class PasswordHasherBusy(Exception):
+    pass
+
+class PasswordHasher:
+    def __init__(self):
+        self.method = None
+        self._prefix = None
+        self._executor = None
+        self._slots = None
+
+    def init_app(self, app):
+        workers = app.config['PASSWORD_HASH_WORKERS']
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        # Werkzeug vult verkorte methodes aan ('scrypt' wordt 'scrypt:32768:8:1'); vergelijk
+        # daarom met het prefix van een echte hash, anders wordt bij elke login opnieuw gehasht
+        self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        # De executor start zijn threads pas bij de eerste hash
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + app.config['PASSWORD_HASH_QUEUE'])
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
 
+    def verify(self, stored, password):
+        return self._run(check_password_hash, stored, password)
 
+    def needs_rehash(self, stored):
+        """True als de hash met een andere methode of werkfactor is gemaakt dan de huidige."""
+        return stored.split('$', 1)[0] != self._prefix
 
+password_hasher = PasswordHasher()
+
+@api.app_errorhandler(PasswordHasherBusy)
+def _password_hasher_busy(e):
+    response = jsonify({'message': 'Te veel gelijktijdige aanmeldingen, probeer het zo opnieuw'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+# Live notificaties (server-sent events): per worker een hub die events verdeelt over de
+# open streams van dat proces. Events zijn licht (type en id's); clients halen zelf op.
+class EventStreamsFull(Exception):
+    pass
+
+class EventSubscription:
+    def __init__(self, identity, queue_size):
+        self.identity = identity
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def wants(self, event):
+        return self.identity.role in event['roles'] or event['user_id'] == self.identity.id
+
+class LocalEventBroker:
+    """Geen broker: events gaan alleen naar streams in dit proces."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, event):
+        self.hub.dispatch(event)
+
+    def start(self):
+        pass
+
+class RedisEventBroker:
+    """Redis pub/sub: events van elke worker gaan via één luister-thread naar de hub van alle workers."""
+
+    def __init__(self, hub, url, channel):
+        if redis is None:
+            raise RuntimeError('EVENT_BROKER_URL vereist het redis pakket')
+        self.hub = hub
+        self.channel = channel
+        self.client = redis.Redis.from_url(url)
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        self.client.publish(self.channel, json.dumps(event))
+
+    def start(self):
+        # Pas bij de eerste stream starten: threads uit de master overleven de fork van preload_app niet
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='event-broker', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self.hub.dispatch(json.loads(message['data']))
+            except redis.RedisError:
+                time.sleep(1)
+
+class EventHub:
+    def __init__(self):
+        self.broker = LocalEventBroker(self)
+        self.max_streams = 0
+        self.queue_size = 0
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_streams = app.config['EVENTS_MAX_STREAMS']
+        self.queue_size = app.config['EVENTS_QUEUE_SIZE']
+        url = app.config['EVENT_BROKER_URL']
+        if url:
+            self.broker = RedisEventBroker(self, url, app.config['EVENT_BROKER_CHANNEL'])
+        else:
+            self.broker = LocalEventBroker(self)
+
+    def subscribe(self, identity):
+        with self._lock:
+            if len(self._subscriptions) >= self.max_streams:
+                raise EventStreamsFull()
+            subscription = EventSubscription(identity, self.queue_size)
+            self._subscriptions.add(subscription)
+        self.broker.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type, data, user_id=None, roles=('admin',)):
+        """Na de commit aanroepen; `roles` zien alle events van dit type, anderen alleen die van `user_id`."""
+        event = {'type': event_type, 'data': data, 'user_id': user_id, 'roles': list(roles)}
+        try:
+            self.broker.publish(event)
+        except Exception:
+            # De wijziging is al opgeslagen; een gemiste notificatie mag de request niet laten falen
+            current_app.logger.exception('Event %s kon niet worden gepubliceerd', event_type)
+
+    def dispatch(self, event):
+        if event['type'] == USERS_CHANGED_EVENT:
+            for user_id in event['data']['ids']:
+                identity_cache.pop(user_id)
+            return
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.wants(event):
+                try:
+                    subscription.queue.put_nowait(event)
+                except queue.Full:
+                    # Trage client: krijgt een resync en haalt zijn lijsten opnieuw op
+                    subscription.overflowed = True
+
+events = EventHub()
+
+@api.app_errorhandler(EventStreamsFull)
+def _event_streams_full(e):
+    response = jsonify({'message': 'Te veel open event streams, probeer het later opnieuw'})
+    response.headers['Retry-After'] = '30'
+    return response, 503
+
+def _event_stream(subscription, heartbeat):
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            if subscription.overflowed:
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.overflowed = False
+                yield 'event: resync\ndata: {}\n\n'
+            try:
+                event = subscription.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                # Houdt proxies open en merkt verbroken verbindingen op
+                yield ': ping\n\n'
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+    finally:
+        events.unsubscribe(subscription)
+
+# Stream tickets: ondertekend met de JWT sleutel maar met een eigen salt, dus alleen
+# bruikbaar voor /api/events en niet als access token (en andersom)
+EVENT_TICKET_SALT = 'event-stream-ticket'
+
+def _event_ticket_serializer():
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt=EVENT_TICKET_SALT)
+
+@api.route('/api/events/ticket', methods=['POST'])
+@jwt_required()
+def event_ticket():
+    user = current_user_identity()
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+    return jsonify({
+        'ticket': _event_ticket_serializer().dumps(user.id),
+        'expires_in': current_app.config['EVENTS_TICKET_SECONDS'],
+    })
+
+@api.route('/api/events', methods=['GET'])
+def event_stream():
+    try:
+        user_id = _event_ticket_serializer().loads(
+            request.args.get('ticket', ''), max_age=current_app.config['EVENTS_TICKET_SECONDS']
+        )
+    except BadSignature:  # ook verlopen tickets
+        return jsonify({'message': 'Ongeldig of verlopen ticket'}), 401
+    user = load_user_identity(user_id)
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+    subscription = events.subscribe(user)
+    response = Response(
+        _event_stream(subscription, current_app.config['EVENTS_HEARTBEAT_SECONDS']),
+        mimetype='text/event-stream',
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 # Authentication endpoints
-@app.route('/api/auth/login', methods=['POST'])
+@api.route('/api/auth/login', methods=['POST'])
 def login():
     data = request.get_json()
     if not data or 'email' not in data or 'password' not in data:
@@ -168,303 +1539,541 @@ def login():
     user = User.query.filter_by(email=data['email']).first()
     
     if user and user.check_password(data['password']):
-        access_token = create_access_token(identity=user.id)
+        if password_hasher.needs_rehash(user.password):
+            # Oude hash (bijv. 'sha256' of lagere werkfactor) naar de huidige parameters
+            user.set_password(data['password'])
+            db.session.commit()
+        identity = _user_identity(user)
+        identity_cache.set(user.id, identity)
+        access_token = create_access_token(
+            identity=str(user.id),
+            additional_claims={'email': user.email, 'name': user.name, 'role': user.role}
+        )
         return jsonify({
             'token': access_token,
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'name': user.name,
-                'role': user.role
-            }
+            'user': identity._asdict()
         }), 200
     
     return jsonify({'message': 'Ongeldige inloggegevens'}), 401
 
-@app.route('/api/auth/verify', methods=['GET'])
+@api.route('/api/auth/verify', methods=['GET'])
 @jwt_required()
 def verify_token():
     try:
-        current_user = get_jwt_identity()
-        if isinstance(current_user, dict):
-            user_id = current_user.get('user_id')
-        else:
-            user_id = current_user
-            
-        user = User.query.get(user_id)
+        user = current_user_identity()
         if not user:
             return jsonify({'message': 'Gebruiker niet gevonden'}), 404
-        
-        return jsonify({
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'name': user.name,
-                'role': user.role
-            }
-        }), 200
+
+        return jsonify({'user': user._asdict()}), 200
     except Exception as e:
         print(f'Error in verify_token: {str(e)}')
         return jsonify({'message': 'Er is een fout opgetreden'}), 500
 
-@app.route('/api/auth/me', methods=['GET'])
+@api.route('/api/auth/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
     try:
-        current_user = get_jwt_identity()
-        if isinstance(current_user, dict):
-            user_id = current_user.get('user_id')
-        else:
-            user_id = current_user
-            
-        user = User.query.get(user_id)
+        user = current_user_identity()
         if not user:
             return jsonify({'message': 'Gebruiker niet gevonden'}), 404
-        
-        return jsonify({
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'name': user.name,
-                'role': user.role
-            }
-        }), 200
+
+        return jsonify({'user': user._asdict()}), 200
     except Exception as e:
         print(f'Error in get_current_user: {str(e)}')
         return jsonify({'message': 'Er is een fout opgetreden'}), 500
 
 # Protected route example
-@app.route('/api/protected', methods=['GET'])
+@api.route('/api/protected', methods=['GET'])
 @jwt_required()
 def protected():
     current_user = get_jwt_identity()
     return jsonify({'logged_in_as': current_user})
 
 # API: afspraken ophalen en toevoegen
-from flask_jwt_extended import jwt_required, get_jwt_identity
 
-@app.route('/api/appointments/fake', methods=['POST'])
+@api.route('/api/appointments/fake', methods=['POST'])
 @jwt_required()
 def add_fake_appointments():
-    user = User.query.filter_by(email=get_jwt_identity()).first()
+    user = current_user_identity()
     if not user or user.role != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
-    from datetime import datetime, timedelta
     admin = User.query.filter_by(role='admin').first()
     advisor = User.query.filter_by(role='adviseur').first()
-    appts = [
-        Appointment(
-            user_id=admin.id,
-            title='Kennismaking',
-            description='Eerste kennismaking met klant',
-            start=datetime.now() + timedelta(days=1, hours=9),
-            end=datetime.now() + timedelta(days=1, hours=10)
-        ),
-        Appointment(
-            user_id=admin.id,
-            title='Polisbespreking',
-            description='Bespreking autoverzekering',
-            start=datetime.now() + timedelta(days=2, hours=14),
-            end=datetime.now() + timedelta(days=2, hours=15)
-        ),
-        Appointment(
-            user_id=advisor.id if advisor else admin.id,
-            title='Adviesgesprek',
-            description='Advies over woonverzekering',
-            start=datetime.now() + timedelta(days=3, hours=11),
-            end=datetime.now() + timedelta(days=3, hours=12)
-        )
-    ]
-    db.session.add_all(appts)
+    db.session.add_all(_sample_appointments(admin, advisor))
     db.session.commit()
     return jsonify({'message': 'Fictieve afspraken toegevoegd.'}), 201
 
-@app.route('/api/appointments', methods=['GET'])
+def _sample_appointments(admin, advisor):
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        Appointment(user_id=admin.id, onderwerp='Kennismaking', notities='Eerste kennismaking met klant',
+                    datum=today + timedelta(days=1, hours=9)),
+        Appointment(user_id=admin.id, onderwerp='Polisbespreking', notities='Bespreking autoverzekering',
+                    datum=today + timedelta(days=2, hours=14)),
+        Appointment(user_id=advisor.id if advisor else admin.id, onderwerp='Adviesgesprek',
+                    notities='Advies over woonverzekering', datum=today + timedelta(days=3, hours=11)),
+    ]
+
+def _parse_request_datetime(value):
+    # Frontend stuurt toISOString() (UTC met 'Z'); opgeslagen tijden zijn naive
+    if not isinstance(value, str):
+        raise ValueError('Datum moet een ISO tekst zijn')
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+def overlapping_appointments(user_id, start, end, exclude_id=None):
+    """Afspraken van `user_id` die [start, end) overlappen.
+
+    Een afspraak duurt hoogstens APPOINTMENT_MAX_MINUTES, dus alleen afspraken die in
+    [start - max duur, end) beginnen komen in aanmerking: een range scan op (user_id, datum).
+    """
+    earliest = start - timedelta(minutes=current_app.config['APPOINTMENT_MAX_MINUTES'])
+    query = Appointment.query.filter(
+        Appointment.user_id == user_id,
+        Appointment.datum > earliest,
+        Appointment.datum < end,
+    )
+    if exclude_id is not None:
+        query = query.filter(Appointment.id != exclude_id)
+    return [a for a in query.order_by(Appointment.datum) if a.eind > start]
+
+@api.route('/api/appointments', methods=['GET'])
 @jwt_required()
 def get_appointments():
-    user = User.query.filter_by(email=get_jwt_identity()).first()
+    """Agenda voor een periode: ?from=&to= (ISO, standaard de komende 31 dagen) en voor admins ?user_id=."""
+    user = current_user_identity()
     if not user:
         return jsonify({'error': 'Unauthorized'}), 401
-    if user.role == 'admin':
-        appointments = Appointment.query.all()
-    else:
-        appointments = Appointment.query.filter_by(user_id=user.id).all()
-    return jsonify([
-        {
-            'id': a.id,
-            'user_id': a.user_id,
-            'user_name': a.user.name,
-            'title': a.title,
-            'description': a.description,
-            'start': a.start.isoformat(),
-            'end': a.end.isoformat()
-        } for a in appointments
-    ])
+    try:
+        start = _parse_request_datetime(request.args['from']) if 'from' in request.args else \
+            datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = _parse_request_datetime(request.args['to']) if 'to' in request.args else start + timedelta(days=31)
+    except ValueError:
+        return jsonify({'message': 'Ongeldige datum'}), 400
+    if end <= start or end - start > timedelta(days=current_app.config['APPOINTMENT_MAX_RANGE_DAYS']):
+        return jsonify({'message': f'Periode moet tussen 0 en {current_app.config["APPOINTMENT_MAX_RANGE_DAYS"]} dagen liggen'}), 400
+
+    owner = request.args.get('user_id', type=int) if user.role == 'admin' else user.id
+    # De standaardperiode schuift mee met de dag en de response bevat gebruikersnamen:
+    # beide horen in de ETag
+    etag = resource_etag('appointments', owner if owner is not None else '*', related=('users:*',),
+                         scope=f'{start.isoformat()}/{end.isoformat()}')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    # Eén query: afspraken in de periode met de naam van de gebruiker erbij
+    earliest = start - timedelta(minutes=current_app.config['APPOINTMENT_MAX_MINUTES'])
+    query = db.select(Appointment, User.name).join(User, User.id == Appointment.user_id).where(
+        Appointment.datum > earliest, Appointment.datum < end
+    ).order_by(Appointment.datum, Appointment.id)
+    if owner is not None:
+        query = query.where(Appointment.user_id == owner)
+    rows = db.session.execute(query).all()
+    return with_etag(jsonify([
+        appointment.to_dict(user_name) for appointment, user_name in rows if appointment.eind > start
+    ]), etag)
 
-@app.route('/api/appointments', methods=['POST'])
+@api.route('/api/appointments', methods=['POST'])
 @jwt_required()
 def add_appointment():
-    user = User.query.filter_by(email=get_jwt_identity()).first()
+    user = current_user_identity()
     if not user:
         return jsonify({'error': 'Unauthorized'}), 401
-    data = request.get_json()
+    data = request.get_json() or {}
+    if not data.get('onderwerp') or not data.get('start'):
+        return jsonify({'message': 'Onderwerp en starttijd zijn verplicht'}), 400
+    try:
+        start = _parse_request_datetime(data['start'])
+        end = _parse_request_datetime(data['end']) if data.get('end') else start + timedelta(minutes=60)
+    except ValueError:
+        return jsonify({'message': 'Ongeldige datum'}), 400
+    duur = int((end - start).total_seconds() // 60)
+    if not 0 < duur <= current_app.config['APPOINTMENT_MAX_MINUTES']:
+        return jsonify({'message': f'Duur moet tussen 1 en {current_app.config["APPOINTMENT_MAX_MINUTES"]} minuten liggen'}), 400
+
     new_appt = Appointment(
         user_id=user.id,
-        title=data.get('title'),
-        description=data.get('description'),
-        start=datetime.fromisoformat(data.get('start')),
-        end=datetime.fromisoformat(data.get('end'))
+        datum=start,
+        duur=duur,
+        onderwerp=data['onderwerp'],
+        notities=data.get('notities'),
     )
+    # Gelijktijdige boekingen voor dezelfde gebruiker na elkaar afhandelen: op PostgreSQL
+    # houdt de rij-lock op de gebruiker (tot de commit) een tweede boeking tegen tot de
+    # eerste vastligt, zodat de controle hieronder die ziet. SQLite kent geen FOR UPDATE;
+    # daar serialiseert de write lock van de flush de boekingen.
+    db.session.execute(db.select(User.id).where(User.id == user.id).with_for_update())
     db.session.add(new_appt)
+    db.session.flush()
+    conflicts = overlapping_appointments(user.id, start, end, exclude_id=new_appt.id)
+    if conflicts:
+        body = {
+            'message': 'Afspraak overlapt met een bestaande afspraak',
+            'conflicts': [a.to_dict(user.name) for a in conflicts],
+        }
+        db.session.rollback()
+        return jsonify(body), 409
     db.session.commit()
-    return jsonify({'message': 'Afspraak toegevoegd'}), 201
+    events.publish('appointment.created', {'id': new_appt.id, 'start': iso_datetime(new_appt.datum)},
+                   user_id=new_appt.user_id, roles=('admin',))
+    return jsonify({'message': 'Afspraak toegevoegd', 'appointment': new_appt.to_dict(user.name)}), 201
 
-# Create tables
-def init_db():
-    with app.app_context():
-        db.create_all()
-        # Admin user
-        admin = User.query.filter_by(email='admin@riskproactief.nl').first()
-        if not admin:
-            admin = User(
-                email='admin@riskproactief.nl',
-                name='Administrator',
-                role='admin'
-            )
-            admin.set_password('admin123')
-            db.session.add(admin)
-            db.session.commit()
+# Demo data (zie seed.py): idempotent en set-based, per tabel één query voor wat er al
+# is en één insert voor wat ontbreekt, ongeacht het aantal demo rijen
+DEMO_USERS = [
+    {'email': 'admin@riskproactief.nl', 'name': 'Administrator', 'role': 'admin', 'password': 'admin123'},
+    {'email': 'adviseur@riskproactief.nl', 'name': 'Adviseur Demo', 'role': 'adviseur', 'password': 'adviseur123'},
+]
+DEMO_POLICIES = {
+    'admin@riskproactief.nl': [
+        dict(type='Autoverzekering', dekking='All-risk', premie=89.50, eigen_risico=350.00,
+             beschrijving='Volledige dekking voor uw auto inclusief diefstal, schade en pech onderweg.'),
+        dict(type='Woonverzekering', dekking='Opstal en Inboedel', premie=45.75, eigen_risico=250.00,
+             beschrijving='Complete dekking voor uw woning en bezittingen.'),
+        dict(type='Aansprakelijkheidsverzekering', dekking='Particulier', premie=5.95, eigen_risico=0.00,
+             beschrijving='Bescherming tegen schade aan anderen.'),
+    ],
+    'adviseur@riskproactief.nl': [
+        dict(type='Bedrijfsautoverzekering', dekking='WA + Volledig Casco', premie=120.00, eigen_risico=500.00,
+             beschrijving='Volledige dekking voor bedrijfsauto inclusief schade en diefstal.'),
+        dict(type='Zakelijke Aansprakelijkheidsverzekering', dekking='Zakelijk', premie=25.00, eigen_risico=250.00,
+             beschrijving='Bescherming tegen zakelijke aansprakelijkheid.'),
+    ],
+}
 
-        # Adviseur user
-        advisor = User.query.filter_by(email='adviseur@riskproactief.nl').first()
-        if not advisor:
-            advisor = User(
-                email='adviseur@riskproactief.nl',
-                name='Adviseur Demo',
-                role='adviseur'
-            )
-            advisor.set_password('adviseur123')
-            db.session.add(advisor)
-            db.session.commit()
+def seed_demo_data():
+    """Voeg ontbrekende demo gebruikers, polissen en afspraken toe en werk bestaande demo polissen bij.
 
-        # Fictieve afspraken
-        from datetime import timedelta
-        if not Appointment.query.first():
-            appts = [
-                Appointment(
-                    user_id=admin.id,
-                    title='Kennismaking',
-                    description='Eerste kennismaking met klant',
-                    start=datetime.now() + timedelta(days=1, hours=9),
-                    end=datetime.now() + timedelta(days=1, hours=10)
-                ),
-                Appointment(
-                    user_id=admin.id,
-                    title='Polisbespreking',
-                    description='Bespreking autoverzekering',
-                    start=datetime.now() + timedelta(days=2, hours=14),
-                    end=datetime.now() + timedelta(days=2, hours=15)
-                ),
-                Appointment(
-                    user_id=advisor.id if advisor else admin.id,
-                    title='Adviesgesprek',
-                    description='Advies over woonverzekering',
-                    start=datetime.now() + timedelta(days=3, hours=11),
-                    end=datetime.now() + timedelta(days=3, hours=12)
-                )
-            ]
-            db.session.add_all(appts)
-            db.session.commit()
+    Geeft het aantal toegevoegde rijen per tabel terug. Via de ORM, zodat statistieken en
+    resource versies via de gewone session events worden bijgewerkt.
+    """
+    added = {'users': 0, 'policies': 0, 'appointments': 0}
+    users = {u.email: u for u in User.query.filter(User.email.in_([spec['email'] for spec in DEMO_USERS]))}
+    for spec in DEMO_USERS:
+        if spec['email'] not in users:
+            user = User(email=spec['email'], name=spec['name'], role=spec['role'])
+            user.set_password(spec['password'])
+            db.session.add(user)
+            users[spec['email']] = user
+            added['users'] += 1
+    db.session.flush()
 
-        # Policies voor admin
-        if admin:
-            sample_policies_admin = [
-                dict(
-                    user_id=admin.id,
-                    type='Autoverzekering',
-                    dekking='All-risk',
-                    premie=89.50,
-                    eigen_risico=350.00,
-                    vervaldatum=datetime.now() + timedelta(days=365),
-                    status='actief',
-                    beschrijving='Volledige dekking voor uw auto inclusief diefstal, schade en pech onderweg.'
-                ),
-                dict(
-                    user_id=admin.id,
-                    type='Woonverzekering',
-                    dekking='Opstal en Inboedel',
-                    premie=45.75,
-                    eigen_risico=250.00,
-                    vervaldatum=datetime.now() + timedelta(days=365),
-                    status='actief',
-                    beschrijving='Complete dekking voor uw woning en bezittingen.'
-                ),
-                dict(
-                    user_id=admin.id,
-                    type='Aansprakelijkheidsverzekering',
-                    dekking='Particulier',
-                    premie=5.95,
-                    eigen_risico=0.00,
-                    vervaldatum=datetime.now() + timedelta(days=365),
-                    status='actief',
-                    beschrijving='Bescherming tegen schade aan anderen.'
-                )
-            ]
-            for p in sample_policies_admin:
-                exists = Policy.query.filter_by(
-                    user_id=p['user_id'],
-                    type=p['type'],
-                    dekking=p['dekking'],
-                    premie=p['premie'],
-                    eigen_risico=p['eigen_risico'],
-                    status=p['status'],
-                    beschrijving=p['beschrijving']
-                ).first()
-                if not exists:
-                    db.session.add(Policy(**p))
-            db.session.commit()
+    owner_ids = [users[email].id for email in DEMO_POLICIES]
+    existing = {(p.user_id, p.type): p for p in Policy.query.filter(Policy.user_id.in_(owner_ids))}
+    vervaldatum = datetime.now() + timedelta(days=365)
+    for email, policies in DEMO_POLICIES.items():
+        owner = users[email]
+        for spec in policies:
+            policy = existing.get((owner.id, spec['type']))
+            if policy is None:
+                db.session.add(Policy(user_id=owner.id, vervaldatum=vervaldatum, status='actief', **spec))
+                added['policies'] += 1
+            else:
+                for name, value in spec.items():
+                    setattr(policy, name, value)
 
-        # Policies voor adviseur
-        if advisor:
-            sample_policies_advisor = [
-                dict(
-                    user_id=advisor.id,
-                    type='Bedrijfsautoverzekering',
-                    dekking='WA + Volledig Casco',
-                    premie=120.00,
-                    eigen_risico=500.00,
-                    vervaldatum=datetime.now() + timedelta(days=365),
-                    status='actief',
-                    beschrijving='Volledige dekking voor bedrijfsauto inclusief schade en diefstal.'
-                ),
-                dict(
-                    user_id=advisor.id,
-                    type='Zakelijke Aansprakelijkheidsverzekering',
-                    dekking='Zakelijk',
-                    premie=25.00,
-                    eigen_risico=250.00,
-                    vervaldatum=datetime.now() + timedelta(days=365),
-                    status='actief',
-                    beschrijving='Bescherming tegen zakelijke aansprakelijkheid.'
-                )
-            ]
-            for p in sample_policies_advisor:
-                exists = Policy.query.filter_by(
-                    user_id=p['user_id'],
-                    type=p['type'],
-                    dekking=p['dekking'],
-                    premie=p['premie'],
-                    eigen_risico=p['eigen_risico'],
-                    status=p['status'],
-                    beschrijving=p['beschrijving']
-                ).first()
-                if not exists:
-                    db.session.add(Policy(**p))
-            db.session.commit()
+    has_appointments = db.session.query(
+        Appointment.query.filter(Appointment.user_id.in_(owner_ids)).exists()
+    ).scalar()
+    if not has_appointments:
+        appointments = _sample_appointments(users['admin@riskproactief.nl'], users['adviseur@riskproactief.nl'])
+        db.session.add_all(appointments)
+        added['appointments'] = len(appointments)
+    db.session.commit()
+    return added
+
+# Metrics: latency, SQL en responsgrootte per route, als Prometheus tekst op /metrics.
+# Elke worker houdt zijn eigen tellers bij; met METRICS_DIR worden die van alle workers
+# bij een scrape opgeteld (zie SharedMetrics).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+class MetricsRegistry:
+    """Thread-safe counters en histogrammen met labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, kind, help_text):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0, 'count': 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram['counts'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        """Alle tellers en histogrammen als JSON-serialiseerbare lijsten."""
+        with self._lock:
+            return {
+                'counters': [[name, [list(pair) for pair in labels], value]
+                             for (name, labels), value in self._counters.items()],
+                'histograms': [[name, [list(pair) for pair in labels], list(h['buckets']), list(h['counts']),
+                                h['sum'], h['count']] for (name, labels), h in self._histograms.items()],
+            }
+
+    def merge(self, snapshot):
+        """Tel een snapshot (van een andere worker) bij deze registry op."""
+        with self._lock:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, labels, buckets, counts, total, count in snapshot['histograms']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = {'buckets': tuple(buckets), 'counts': [0] * len(buckets), 'sum': 0, 'count': 0}
+                histogram['counts'] = [a + b for a, b in zip(histogram['counts'], counts)]
+                histogram['sum'] += total
+                histogram['count'] += count
+
+    def render(self):
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"') for _, v in pairs)
+            return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, dict(v, counts=list(v['counts']))) for k, v in self._histograms.items())
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = self._help.get(name, ('counter', name))
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            lines.append(f'{name}{fmt(labels)} {value}')
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = self._help.get(name, ('histogram', name))
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            for bound, count in zip(histogram['buckets'], histogram['counts']):
+                lines.append(f'{name}_bucket{fmt(labels, [("le", bound)])} {count}')
+            lines.append(f'{name}_bucket{fmt(labels, [("le", "+Inf")])} {histogram["count"]}')
+            lines.append(f'{name}_sum{fmt(labels)} {histogram["sum"]}')
+            lines.append(f'{name}_count{fmt(labels)} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+metrics.describe('http_requests_total', 'counter', 'Aantal afgehandelde requests')
+metrics.describe('http_request_errors_total', 'counter', 'Aantal requests met een 5xx of onafgevangen fout')
+metrics.describe('http_request_duration_seconds', 'histogram', 'Verwerkingstijd per request')
+metrics.describe('http_response_size_bytes', 'histogram', 'Grootte van de response body')
+metrics.describe('http_request_sql_queries_total', 'counter', 'Aantal SQL statements uitgevoerd door requests')
+metrics.describe('http_request_sql_seconds_total', 'counter', 'Tijd besteed aan SQL statements door requests')
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class SharedMetrics:
+    """Tellers van alle gunicorn workers samen.
+
+    Elke worker schrijft hooguit elke METRICS_FLUSH_SECONDS (en bij afsluiten) zijn totalen
+    naar <METRICS_DIR>/<pid>.json; /metrics telt alle bestanden op. Bestanden van gestopte
+    workers (max_requests) gaan op in retired.json, zodat tellers niet teruglopen. Een
+    scrape kan dus tot METRICS_FLUSH_SECONDS achterlopen op stille workers.
+    """
+
+    RETIRED = 'retired.json'
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.directory = None
+        self.interval = 5
+        self._last_flush = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.directory = app.config['METRICS_DIR'] or None
+        self.interval = app.config['METRICS_FLUSH_SECONDS']
+
+    def _write(self, name, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, path)
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def flush(self):
+        if not self.directory:
+            return
+        self._write(f'{os.getpid()}.json', self.registry.snapshot())
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if not self.directory or time.monotonic() - self._last_flush < self.interval:
+            return
+        if self._lock.acquire(blocking=False):
+            try:
+                self.flush()
+            finally:
+                self._lock.release()
+
+    def collect(self):
+        """Registry met de tellers van alle workers (zonder METRICS_DIR: alleen deze)."""
+        if not self.directory:
+            return self.registry
+        self.flush()
+        merged = MetricsRegistry()
+        merged._help = self.registry._help
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            retired = MetricsRegistry()
+            retired.merge(self._read(self.RETIRED) or {'counters': [], 'histograms': []})
+            changed = False
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json') or name == self.RETIRED:
+                    continue
+                snapshot = self._read(name)
+                if snapshot is None:
+                    continue
+                if _process_alive(int(name[:-len('.json')])):
+                    merged.merge(snapshot)
+                else:
+                    retired.merge(snapshot)
+                    os.remove(os.path.join(self.directory, name))
+                    changed = True
+            retired_snapshot = retired.snapshot()
+            if changed:
+                self._write(self.RETIRED, retired_snapshot)
+        merged.merge(retired_snapshot)
+        return merged
+
+shared_metrics = SharedMetrics(metrics)
+
+def _route_labels():
+    rule = request.url_rule.rule if request.url_rule else 'unmatched'
+    return {'method': request.method, 'route': rule}
+
+def instrument_engine(engine):
+    """Tel SQL statements en hun duur per request via engine events."""
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        if has_request_context() and 'request_started' in g:
+            g.sql_count += 1
+            g.sql_seconds += elapsed
+            if current_app.config['SLOW_REQUEST_MS']:
+                g.sql_statements.append((elapsed, statement))
+
+@api.before_app_request
+def _start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_seconds = 0.0
+    g.sql_statements = []
+
+@api.after_app_request
+def _record_request_metrics(response):
+    if 'request_started' not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    labels = _route_labels()
+    metrics.inc('http_requests_total', dict(labels, status=response.status_code))
+    metrics.observe('http_request_duration_seconds', labels, elapsed, LATENCY_BUCKETS)
+    metrics.inc('http_request_sql_queries_total', labels, g.sql_count)
+    metrics.inc('http_request_sql_seconds_total', labels, g.sql_seconds)
+    if response.content_length is not None:
+        metrics.observe('http_response_size_bytes', labels, response.content_length, SIZE_BUCKETS)
+    if response.status_code >= 500:
+        metrics.inc('http_request_errors_total', labels)
+    shared_metrics.maybe_flush()
+
+    slow_ms = current_app.config['SLOW_REQUEST_MS']
+    if slow_ms and elapsed * 1000 >= slow_ms:
+        current_app.logger.warning(
+            'Trage request %s %s: %.1f ms, %d SQL statements (%.1f ms)\n%s',
+            request.method, request.full_path, elapsed * 1000, g.sql_count, g.sql_seconds * 1000,
+            '\n'.join(f'  {seconds * 1000:.1f} ms  {statement}' for seconds, statement in g.sql_statements)
+        )
+    return response
+
+@api.teardown_app_request
+def _record_request_exception(exc):
+    # Onafgevangen fouten komen niet in after_request terecht
+    if exc is not None and 'request_started' in g:
+        metrics.inc('http_request_errors_total', _route_labels())
+
+@api.route('/metrics')
+def metrics_endpoint():
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return Response(shared_metrics.collect().render(), mimetype='text/plain; version=0.0.4')
+
+# Compressie van grote responses (brotli indien beschikbaar, anders gzip)
+def _negotiate_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+@api.after_app_request
+def _compress_response(response):
+    if (
+        response.direct_passthrough
+        or response.status_code != 200
+        or 'Content-Encoding' in response.headers
+        or (response.content_length or 0) < current_app.config['COMPRESS_MIN_SIZE']
+    ):
+        return response
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=min(current_app.config['COMPRESS_LEVEL'], 11))
+    else:
+        compressed = gzip.compress(data, compresslevel=current_app.config['COMPRESS_LEVEL'], mtime=0)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
 
 # Health check and root endpoints
-@app.route('/')
-@app.route('/health')
+@api.route('/')
+@api.route('/health')
 def health_check():
     response = jsonify({
         'status': 'healthy',
@@ -475,106 +2084,702 @@ def health_check():
     return response
 
 # API Routes
-@app.route('/api/policies', methods=['GET'])
+@api.route('/api/policies', methods=['GET'])
 @jwt_required()
 def get_policies():
     try:
         # Get current user
-        current_user = get_jwt_identity()
-        print(f'Current user identity: {current_user}')
-
-        # Extract user_id
-        if isinstance(current_user, dict):
-            user_id = current_user.get('user_id')
-        else:
-            user_id = current_user
-
-        print(f'Fetching policies for user_id: {user_id}')
-
-        # Get user to verify they exist
-        user = User.query.get(user_id)
+        user = current_user_identity()
         if not user:
-            print(f'User {user_id} not found')
             return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+        user_id = user.id
+        etag = resource_etag('policies', user_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
 
         # Get policies for user
         policies = Policy.query.filter_by(user_id=user_id).all()
-        print(f'Found {len(policies)} policies')
 
         # Convert policies to dict
         result = []
         for policy in policies:
             try:
-                policy_dict = policy.to_dict()
-                result.append(policy_dict)
-                print(f'Converted policy {policy.id}: {policy_dict}')
+                result.append(policy.to_dict())
             except Exception as e:
-                print(f'Error converting policy {policy.id} to dict: {str(e)}')
+                current_app.logger.warning('Error converting policy %s to dict: %s', policy.id, e)
                 continue
 
-        return jsonify(result), 200
+        return with_etag(jsonify(result), etag), 200
 
     except Exception as e:
         print(f'Error in get_policies: {str(e)}')
         return jsonify({'message': 'Er is een fout opgetreden'}), 500
 
-@app.route('/api/claims', methods=['GET'])
+@api.route('/api/policies/overview', methods=['GET'])
+@jwt_required()
+def get_policies_overview():
+    """Polissen van de gebruiker met claim- en betalingsoverzicht; drie queries, ongeacht het aantal polissen."""
+    user = current_user_identity()
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+    own_policies = db.select(Policy.id).where(Policy.user_id == user.id)
+
+    policies = Policy.query.filter_by(user_id=user.id).order_by(Policy.id).all()
+
+    claim_counts = {}
+    for policy_id, status, count in db.session.execute(
+        db.select(Claim.policy_id, Claim.status, func.count())
+        .where(Claim.policy_id.in_(own_policies))
+        .group_by(Claim.policy_id, Claim.status)
+    ):
+        claim_counts.setdefault(policy_id, {})[status] = count
+
+    paid = Payment.status == PAID_PAYMENT_STATUS
+    payment_totals = {
+        row.policy_id: row for row in db.session.execute(
+            db.select(
+                Payment.policy_id,
+                func.coalesce(func.sum(db.case((paid, Payment.bedrag), else_=0)), 0).label('total_paid'),
+                func.coalesce(func.sum(db.case((paid, 0), else_=Payment.bedrag)), 0).label('outstanding'),
+                func.max(db.case((paid, Payment.betaaldatum))).label('last_payment_date'),
+            )
+            .where(Payment.policy_id.in_(own_policies))
+            .group_by(Payment.policy_id)
+        )
+    }
+
+    result = []
+    for policy in policies:
+        by_status = claim_counts.get(policy.id, {})
+        payments = payment_totals.get(policy.id)
+        result.append(dict(
+            policy.to_dict(),
+            claims={'total': sum(by_status.values()), 'by_status': by_status},
+            payments={
+                'total_paid': round(payments.total_paid, 2) if payments else 0,
+                'outstanding': round(payments.outstanding, 2) if payments else 0,
+                'last_payment_date': iso_datetime(payments.last_payment_date) if payments else None,
+            },
+        ))
+    return jsonify(result), 200
+
+# Claim documenten: uploads worden tijdens het parsen in stukken naar schijf
+# geschreven en gehasht, en opgeslagen onder hun SHA-256 (identieke bestanden één keer)
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Alleen PDF en afbeeldingen, herkend aan de inhoud; het mimetype van de client telt niet
+# (een text/html of SVG bestand zou anders vanaf de API origin script kunnen draaien)
+DOCUMENT_HEAD_BYTES = 16
+DOCUMENT_TYPES = {
+    'application/pdf': 'pdf',
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+
+def document_type(head):
+    """Mimetype uit DOCUMENT_TYPES op basis van de eerste bytes, of None."""
+    if head.startswith(b'%PDF-'):
+        return 'application/pdf'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'image/gif'
+    if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+class HashingUploadFile:
+    """Tijdelijk uploadbestand dat de SHA-256 bijhoudt terwijl Werkzeug erin schrijft."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=directory, suffix='.upload')
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self.size = 0
+        self.head = b''  # eerste bytes, om het bestandstype te herkennen
+        self.persisted = False
+
+    def write(self, data):
+        self._hash.update(data)
+        if len(self.head) < DOCUMENT_HEAD_BYTES:
+            self.head += bytes(data[:DOCUMENT_HEAD_BYTES - len(self.head)])
+        self.size += len(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def close(self):
+        self._file.close()
+        if not self.persisted and os.path.exists(self.path):
+            os.unlink(self.path)
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingUploadFile(os.path.join(current_app.config['UPLOAD_FOLDER'], 'tmp'))
+
+
+def document_path(sha256):
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], sha256[:2], sha256[2:4], sha256)
+
+def store_document(upload):
+    """Verplaats een geüpload bestand naar zijn content-addressed pad; geeft (sha256, grootte, nieuw)."""
+    stream = upload.stream
+    stream.flush()
+    sha256 = stream.hexdigest()
+    target = document_path(sha256)
+    if os.path.exists(target):
+        return sha256, stream.size, False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(stream.path, target)
+    stream.persisted = True
+    return sha256, stream.size, True
+
+@api.route('/api/claims', methods=['POST'])
+@jwt_required()
+def create_claim():
+    user = current_user_identity()
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+
+    policy_id = request.form.get('policy_id', type=int)
+    if policy_id is None:
+        return jsonify({'message': 'Polis is verplicht'}), 400
+    policy = db.session.get(Policy, policy_id)
+    if not policy or (user.role not in ('admin', 'adviseur') and policy.user_id != user.id):
+        return jsonify({'message': 'Polis niet gevonden'}), 404
+
+    claim = Claim(policy_id=policy.id, user_id=policy.user_id, status='pending')
+    upload = request.files.get('document')
+    if upload and upload.filename:
+        content_type = document_type(upload.stream.head)
+        if content_type is None:
+            return jsonify({'message': 'Alleen PDF en afbeeldingen (PNG, JPEG, GIF, WebP) zijn toegestaan'}), 415
+        sha256, size, _ = store_document(upload)
+        if not db.session.get(Document, sha256):
+            db.session.add(Document(sha256=sha256, size=size, content_type=content_type))
+        claim.document_hash = sha256
+        claim.document_url = f'/api/documents/{sha256}'
+
+    db.session.add(claim)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Hetzelfde document werd gelijktijdig door een andere request geregistreerd
+        db.session.rollback()
+        claim = Claim(
+            policy_id=claim.policy_id, user_id=claim.user_id, status=claim.status,
+            document_hash=claim.document_hash, document_url=claim.document_url
+        )
+        db.session.add(claim)
+        db.session.commit()
+    events.publish('claim.created', {'id': claim.id, 'policy_id': claim.policy_id},
+                   user_id=claim.user_id, roles=('admin', 'adviseur'))
+    return jsonify(claim.to_dict()), 201
+
+@api.route('/api/documents/<sha256>', methods=['GET'])
+@jwt_required()
+def download_document(sha256):
+    if not SHA256_PATTERN.match(sha256):
+        return jsonify({'message': 'Document niet gevonden'}), 404
+    user = current_user_identity()
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+    if user.role not in ('admin', 'adviseur'):
+        owns = db.session.query(
+            Claim.query.filter_by(document_hash=sha256, user_id=user.id).exists()
+        ).scalar()
+        if not owns:
+            return jsonify({'message': 'Document niet gevonden'}), 404
+    document = db.session.get(Document, sha256)
+    path = document_path(sha256)
+    if not document or not os.path.exists(path):
+        return jsonify({'message': 'Document niet gevonden'}), 404
+    # send_file streamt het bestand en ondersteunt Range requests (206). Altijd als download
+    # en zonder sniffen: de browser mag het bestand nooit als pagina van de API origin tonen.
+    # Documenten van vóór de typecontrole krijgen een neutraal type.
+    content_type = document.content_type if document.content_type in DOCUMENT_TYPES else 'application/octet-stream'
+    response = send_file(
+        path,
+        mimetype=content_type,
+        as_attachment=True,
+        download_name=f'{sha256}.{DOCUMENT_TYPES.get(content_type, "bin")}',
+        conditional=True,
+        etag=sha256,
+        max_age=3600
+    )
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+CLAIMS_PAGE_SIZE = 50
+CLAIMS_MAX_PAGE_SIZE = 200
+
+@api.route('/api/claims', methods=['GET'])
+@jwt_required()
 def get_claims():
-    claims = Claim.query.all()
-    return jsonify([{
-        'id': c.id,
-        'policy_id': c.policy_id,
-        'status': c.status,
-        'document_url': c.document_url
-    } for c in claims])
-
-@app.route('/api/statistics', methods=['GET'])
+    user = current_user_identity()
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+
+    try:
+        cursor = request.args.get('cursor', type=int)
+        limit = int(request.args.get('limit', CLAIMS_PAGE_SIZE))
+        filter_user_id = request.args.get('user_id', type=int)
+        policy_id = request.args.get('policy_id', type=int)
+    except ValueError:
+        return jsonify({'message': 'Ongeldige parameters'}), 400
+    limit = max(1, min(limit, CLAIMS_MAX_PAGE_SIZE))
+    status = request.args.get('status')
+
+    # Klanten zien alleen hun eigen claims; admin en adviseur mogen filteren
+    if user.role not in ('admin', 'adviseur'):
+        filter_user_id = user.id
+
+    etag = resource_etag('claims', filter_user_id if filter_user_id is not None else '*')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return with_etag(jsonify(_claims_page(filter_user_id, policy_id, status, cursor, limit)), etag)
+
+def _claims_page(filter_user_id=None, policy_id=None, status=None, cursor=None, limit=CLAIMS_PAGE_SIZE):
+    # Keyset paginatie op id (nieuwste eerst), filters worden in SQL toegepast
+    query = Claim.query
+    if filter_user_id is not None:
+        query = query.filter(Claim.user_id == filter_user_id)
+    if policy_id is not None:
+        query = query.filter(Claim.policy_id == policy_id)
+    if status:
+        query = query.filter(Claim.status == status)
+    if cursor is not None:
+        query = query.filter(Claim.id < cursor)
+    claims = query.order_by(Claim.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(claims) > limit:
+        claims = claims[:limit]
+        next_cursor = claims[-1].id
+    return {
+        'items': [c.to_dict() for c in claims],
+        'next_cursor': next_cursor
+    }
+
+def load_rollups(metrics):
+    """{metric: {bucket: waarde}} voor de gevraagde metrics, in één query."""
+    rollups = {}
+    for row in StatisticsRollup.query.filter(StatisticsRollup.metric.in_(metrics)):
+        rollups.setdefault(row.metric, {})[row.bucket] = row.value
+    return rollups
+
+@api.route('/api/statistics', methods=['GET'])
 def get_statistics():
-    # Sample statistics data
+    # Alle cijfers komen uit de rollup tabel; er worden geen brontabellen gescand
+    now = datetime.utcnow()
+    months = []
+    for offset in range(5, -1, -1):
+        year, month = divmod(now.year * 12 + now.month - 1 - offset, 12)
+        months.append(datetime(year, month + 1, 1))
+    quarters = []
+    for offset in range(3, -1, -1):
+        year, quarter = divmod(now.year * 4 + (now.month - 1) // 3 - offset, 4)
+        quarters.append((year, quarter + 1))
+
+    rollups = load_rollups(['monthly_premiums', 'claims_by_type', 'customer_growth', 'summary'])
+    monthly = rollups.get('monthly_premiums', {})
+    growth = rollups.get('customer_growth', {})
+    claims_by_type = sorted(
+        ((bucket, value) for bucket, value in rollups.get('claims_by_type', {}).items() if value),
+        key=lambda item: item[1], reverse=True
+    )
+    summary = rollups.get('summary', {})
+
     return jsonify({
         'monthly_premiums': {
-            'labels': ['Jan', 'Feb', 'Mar', 'Apr', 'Mei', 'Jun'],
-            'data': [12000, 19000, 15000, 17000, 22000, 24000]
+            'labels': [MONTH_LABELS[m.month - 1] for m in months],
+            'data': [round(monthly.get(_month_bucket(m), 0), 2) for m in months]
         },
         'claims_by_type': {
-            'labels': ['Auto', 'Woning', 'Reis', 'Aansprakelijkheid'],
-            'data': [30, 25, 15, 10]
+            'labels': [bucket for bucket, _ in claims_by_type],
+            'data': [int(value) for _, value in claims_by_type]
         },
         'customer_growth': {
-            'labels': ['Q1', 'Q2', 'Q3', 'Q4'],
-            'data': [45, 52, 38, 65]
+            'labels': [f'Q{q} {y}' for y, q in quarters],
+            'data': [int(growth.get(f'{y}-Q{q}', 0)) for y, q in quarters]
         },
         'summary': {
-            'active_policies': 24,
-            'open_claims': 8,
-            'total_customers': 156,
-            'total_premium': 45200
-        }
+            'active_policies': int(summary.get('active_policies', 0)),
+            'open_claims': int(summary.get('open_claims', 0)),
+            'total_customers': int(summary.get('total_customers', 0)),
+            'total_premium': round(summary.get('total_premium', 0), 2)
+        },
+        'total_users': int(summary.get('total_users', 0)),
+        'total_policies': int(summary.get('total_policies', 0)),
+        'total_claims': int(summary.get('total_claims', 0)),
+        'total_premiums': round(summary.get('total_premiums', 0), 2),
+        'total_claims_paid': int(summary.get('total_claims_paid', 0))
     })
 
-@app.route('/api/contact', methods=['POST'])
+# Boekhouding: maandoverzichten, ouderdom en totalen komen uit de rollups, saldi per polis
+# en klant uit de bijgehouden policy_balances tabel; betalingen zelf worden niet gescand
+ACCOUNTING_PAGE_SIZE = 50
+ACCOUNTING_MAX_PAGE_SIZE = 500
+ACCOUNTING_MAX_MONTHS = 60
+AGING_BUCKETS = ((0, 'niet_vervallen'), (30, '1-30'), (60, '31-60'), (90, '61-90'), (None, '90+'))
+
+def _money(value):
+    return round(value or 0, 2)
+
+def _aging_bucket(day_bucket, today):
+    if day_bucket == UNKNOWN_BUCKET:
+        return UNKNOWN_BUCKET
+    days_overdue = (today - datetime.strptime(day_bucket, '%Y-%m-%d').date()).days
+    for limit, name in AGING_BUCKETS:
+        if limit is None or days_overdue <= limit:
+            return name
+
+def _accounting_page_args():
+    cursor = request.args.get('cursor', type=int)
+    limit = int(request.args.get('limit', ACCOUNTING_PAGE_SIZE))
+    return cursor, max(1, min(limit, ACCOUNTING_MAX_PAGE_SIZE))
+
+@api.route('/api/accounting/summary', methods=['GET'])
+@jwt_required()
+def get_accounting_summary():
+    error = _admin_error()
+    if error:
+        return error
+    try:
+        month_count = max(1, min(int(request.args.get('months', 12)), ACCOUNTING_MAX_MONTHS))
+    except ValueError:
+        return jsonify({'message': 'Ongeldige parameters'}), 400
+
+    rollups = load_rollups(['ledger', 'ledger_due', 'ledger_paid', 'ledger_open', 'ledger_open_count'])
+
+    now = datetime.utcnow()
+    due, paid = rollups.get('ledger_due', {}), rollups.get('ledger_paid', {})
+    # Openstaand per vervalmaand: de onbetaalde posten met een vervaldag in die maand
+    # (niet verschuldigd min betaald, want betalingen tellen in hun betaalmaand)
+    open_by_month = {}
+    for bucket, amount in rollups.get('ledger_open', {}).items():
+        if bucket != UNKNOWN_BUCKET:
+            open_by_month[bucket[:7]] = open_by_month.get(bucket[:7], 0) + amount
+    months = []
+    for offset in range(month_count - 1, -1, -1):
+        year, month = divmod(now.year * 12 + now.month - 1 - offset, 12)
+        bucket = f'{year}-{month + 1:02d}'
+        months.append({
+            'month': bucket,
+            'due': _money(due.get(bucket)),
+            'paid': _money(paid.get(bucket)),
+            'outstanding': _money(open_by_month.get(bucket)),
+        })
+
+    # Openstaande bedragen per vervaldag (hooguit enkele duizenden buckets) naar ouderdom
+    aging = {name: {'amount': 0, 'count': 0} for _, name in AGING_BUCKETS}
+    aging[UNKNOWN_BUCKET] = {'amount': 0, 'count': 0}
+    counts = rollups.get('ledger_open_count', {})
+    for bucket, amount in rollups.get('ledger_open', {}).items():
+        target = aging[_aging_bucket(bucket, now.date())]
+        target['amount'] += amount
+        target['count'] += int(counts.get(bucket, 0))
+    for values in aging.values():
+        values['amount'] = _money(values['amount'])
+
+    ledger = rollups.get('ledger', {})
+    return jsonify({
+        'totals': {
+            'due': _money(ledger.get('due')),
+            'paid': _money(ledger.get('paid')),
+            'outstanding': _money(ledger.get('due', 0) - ledger.get('paid', 0)),
+            'payments': int(ledger.get('payments', 0)),
+            'open_payments': int(ledger.get('open_payments', 0)),
+        },
+        'months': months,
+        'aging': aging,
+    })
+
+@api.route('/api/accounting/policies', methods=['GET'])
+@jwt_required()
+def get_accounting_policies():
+    user = current_user_identity()
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+    try:
+        cursor, limit = _accounting_page_args()
+        filter_user_id = request.args.get('user_id', type=int)
+    except ValueError:
+        return jsonify({'message': 'Ongeldige parameters'}), 400
+    # Klanten zien alleen hun eigen polissen
+    if user.role != 'admin':
+        filter_user_id = user.id
+
+    query = (
+        db.select(Policy, PolicyBalance)
+        .outerjoin(PolicyBalance, PolicyBalance.policy_id == Policy.id)
+        .order_by(Policy.id)
+        .limit(limit + 1)
+    )
+    if filter_user_id is not None:
+        query = query.where(Policy.user_id == filter_user_id)
+    if cursor is not None:
+        query = query.where(Policy.id > cursor)
+    rows = db.session.execute(query).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][0].id
+    items = []
+    for policy, balance in rows:
+        items.append({
+            'policy_id': policy.id,
+            'user_id': policy.user_id,
+            'type': policy.type,
+            'premie': policy.premie,
+            'status': policy.status,
+            'due': _money(balance.due if balance else 0),
+            'paid': _money(balance.paid if balance else 0),
+            'outstanding': _money(balance.due - balance.paid if balance else 0),
+            'open_payments': balance.open_payments if balance else 0,
+        })
+    return jsonify({'items': items, 'next_cursor': next_cursor})
+
+@api.route('/api/accounting/customers', methods=['GET'])
+@jwt_required()
+def get_accounting_customers():
+    error = _admin_error()
+    if error:
+        return error
+    try:
+        cursor, limit = _accounting_page_args()
+    except ValueError:
+        return jsonify({'message': 'Ongeldige parameters'}), 400
+
+    # Groeperen over de saldotabel in user_id volgorde (index), keyset op user_id
+    query = (
+        db.select(
+            PolicyBalance.user_id,
+            func.sum(PolicyBalance.due).label('due'),
+            func.sum(PolicyBalance.paid).label('paid'),
+            func.sum(PolicyBalance.open_payments).label('open_payments'),
+        )
+        .group_by(PolicyBalance.user_id)
+        .order_by(PolicyBalance.user_id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(PolicyBalance.user_id > cursor)
+    rows = db.session.execute(query).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].user_id
+    users = {
+        u.id: u for u in db.session.execute(
+            db.select(User.id, User.name, User.email).where(User.id.in_([row.user_id for row in rows]))
+        )
+    } if rows else {}
+    items = []
+    for row in rows:
+        customer = users.get(row.user_id)
+        items.append({
+            'user_id': row.user_id,
+            'name': customer.name if customer else None,
+            'email': customer.email if customer else None,
+            'due': _money(row.due),
+            'paid': _money(row.paid),
+            'outstanding': _money(row.due - row.paid),
+            'open_payments': int(row.open_payments or 0),
+        })
+    return jsonify({'items': items, 'next_cursor': next_cursor})
+
+# Dashboard: wat Dashboard.jsx en Claims.jsx bij het openen nodig hebben in één request.
+# De identiteit wordt één keer bepaald en alle secties lopen in dezelfde sessie.
+DASHBOARD_SECTIONS = ('policies', 'claims', 'summary', 'users')
+DASHBOARD_ADMIN_SECTIONS = ('summary', 'users')
+
+def _dashboard_summary():
+    summary = load_rollups(['summary']).get('summary', {})
+    return {
+        'total_customers': int(summary.get('total_customers', 0)),
+        'active_policies': int(summary.get('active_policies', 0)),
+        'open_claims': int(summary.get('open_claims', 0)),
+        'total_premium': round(summary.get('total_premium', 0), 2),
+    }
+
+def _dashboard_etag(user, sections, claims_owner):
+    """Eén ETag over de resource versies van alle gevraagde secties, opgehaald in één query."""
+    keys = {GLOBAL_VERSION_KEY}
+    if 'policies' in sections:
+        keys.add(f'policies:{user.id}')
+    if 'claims' in sections:
+        keys.add(f'claims:{claims_owner}')
+    if 'summary' in sections:
+        keys.update({'policies:*', 'claims:*', 'users:*'})
+    if 'users' in sections:
+        keys.add('users:*')
+    table = ResourceVersion.__table__
+    versions = dict(db.session.execute(
+        db.select(table.c.key, table.c.version).where(table.c.key.in_(keys))
+    ).all())
+    state = ','.join(f'{key}={versions.get(key, 0)}' for key in sorted(keys))
+    variant = f'{user.id}:{user.role}:{",".join(sections)}:{state}'
+    return 'dashboard-' + uuid.uuid5(uuid.NAMESPACE_URL, variant).hex
+
+@api.route('/api/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    started = time.perf_counter()
+    user = current_user_identity()
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+
+    allowed = [name for name in DASHBOARD_SECTIONS if user.role == 'admin' or name not in DASHBOARD_ADMIN_SECTIONS]
+    sections = allowed
+    if request.args.get('include'):
+        sections = [name.strip() for name in request.args['include'].split(',') if name.strip()]
+        invalid = [name for name in sections if name not in allowed]
+        if invalid:
+            return jsonify({'message': f'Onbekende of niet toegestane secties: {", ".join(invalid)}'}), 400
+
+    # Zelfde zichtbaarheid als /api/claims: admin en adviseur zien alle claims
+    claims_owner = '*' if user.role in ('admin', 'adviseur') else user.id
+    etag = _dashboard_etag(user, sections, claims_owner)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    builders = {
+        'policies': lambda: [p.to_dict() for p in Policy.query.filter_by(user_id=user.id).order_by(Policy.id)],
+        'claims': lambda: _claims_page(None if claims_owner == '*' else claims_owner),
+        'summary': _dashboard_summary,
+        'users': lambda: list_page(
+            USER_LIST_COLUMNS, USER_LIST_DEFAULT_FIELDS, 'name', {'per_page': LIST_MAX_PAGE_SIZE}
+        ),
+    }
+    # Eén tijdsbudget voor het geheel: secties die niet meer binnen het budget starten
+    # worden overgeslagen en door de client los opgehaald
+    budget = current_app.config['DASHBOARD_BUDGET_MS'] / 1000
+    result = {'user': user._asdict()}
+    skipped = []
+    for name in sections:
+        if time.perf_counter() - started > budget:
+            skipped.append(name)
+            continue
+        result[name] = builders[name]()
+    if skipped:
+        result['skipped'] = skipped
+        return jsonify(result)
+    return with_etag(jsonify(result), etag)
+
+# Change feed: ?since=<cursor> geeft alleen wat sinds die cursor is aangemaakt, gewijzigd
+# of verwijderd, per object de laatste stand. Zonder since alleen de huidige cursor, om na
+# het laden van de volledige lijsten vanaf te synchroniseren.
+CHANGES_PAGE_SIZE = 200
+CHANGES_MAX_PAGE_SIZE = 1000
+
+def _payment_dict(payment):
+    return {
+        'id': payment.id,
+        'policy_id': payment.policy_id,
+        'status': payment.status,
+        'bedrag': payment.bedrag,
+        'betaaldatum': iso_datetime(payment.betaaldatum),
+        'vervaldatum': iso_datetime(payment.vervaldatum),
+    }
+
+def _load_changed_rows(resource, ids):
+    """{id: dict} met de huidige stand van de gevraagde objecten, één query per resource."""
+    if resource == 'appointments':
+        rows = db.session.execute(
+            db.select(Appointment, User.name).join(User, User.id == Appointment.user_id).where(Appointment.id.in_(ids))
+        ).all()
+        return {appointment.id: appointment.to_dict(user_name) for appointment, user_name in rows}
+    model, serialize = {
+        'policies': (Policy, Policy.to_dict),
+        'claims': (Claim, Claim.to_dict),
+        'payments': (Payment, _payment_dict),
+        'contact': (ContactMessage, ContactMessage.to_dict),
+    }[resource]
+    return {obj.id: serialize(obj) for obj in db.session.scalars(db.select(model).where(model.id.in_(ids)))}
+
+@api.route('/api/changes', methods=['GET'])
+@jwt_required()
+def get_changes():
+    user = current_user_identity()
+    if not user:
+        return jsonify({'message': 'Gebruiker niet gevonden'}), 404
+    try:
+        since = int(request.args['since']) if 'since' in request.args else None
+        limit = int(request.args.get('limit', CHANGES_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'message': 'Ongeldige cursor'}), 400
+    limit = max(1, min(limit, CHANGES_MAX_PAGE_SIZE))
+
+    if since is None:
+        latest = db.session.execute(db.select(func.max(ChangeLogEntry.id))).scalar() or 0
+        return jsonify({'changes': [], 'next_cursor': max(latest, change_log_horizon()), 'has_more': False})
+    if since < change_log_horizon():
+        return jsonify({'message': 'Cursor is verlopen, laad de gegevens opnieuw', 'resync': True}), 410
+
+    # Zelfde zichtbaarheid als de lijst endpoints: admin alles, adviseur ook alle claims,
+    # verder alleen eigen objecten
+    query = db.select(ChangeLogEntry).where(ChangeLogEntry.id > since).order_by(ChangeLogEntry.id).limit(limit + 1)
+    if user.role != 'admin':
+        visible = ChangeLogEntry.user_id == user.id
+        if user.role == 'adviseur':
+            visible = db.or_(visible, ChangeLogEntry.resource == 'claims')
+        query = query.where(visible)
+    entries = db.session.scalars(query).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Per object alleen de laatste actie; aangemaakt en weer verwijderd blijft 'deleted'
+    latest = {}
+    for entry in entries:
+        key = (entry.resource, entry.object_id)
+        latest.pop(key, None)
+        latest[key] = entry
+    wanted = {}
+    for (resource, object_id), entry in latest.items():
+        if entry.action != 'deleted':
+            wanted.setdefault(resource, []).append(object_id)
+    rows = {resource: _load_changed_rows(resource, ids) for resource, ids in wanted.items()}
+
+    changes = []
+    for (resource, object_id), entry in latest.items():
+        data = rows.get(resource, {}).get(object_id)
+        # Intussen verwijderd (de delete volgt later in de feed): nu al als verwijderd melden
+        action = entry.action if data is not None else 'deleted'
+        changes.append({
+            'cursor': entry.id,
+            'resource': resource,
+            'id': object_id,
+            'action': action,
+            'data': data,
+        })
+    return jsonify({
+        'changes': changes,
+        'next_cursor': entries[-1].id if entries else since,
+        'has_more': has_more,
+    })
+
+@api.route('/api/contact', methods=['POST'])
 def contact():
     try:
         data = request.get_json()
-        
-        # E-mail bericht samenstellen
-        msg = Message(
-            subject=f'Nieuw contactformulier: {data["onderwerp"]}',
-            recipients=[os.environ.get('CONTACT_EMAIL', 'default@riskproactief.nl')]
-        )
-        
-        msg.body = f'''
-        Naam: {data["naam"]}
-        E-mail: {data["email"]}
-        Telefoon: {data["telefoon"]}
-        Voorkeur contact: {data["voorkeurContact"]}
-        Onderwerp: {data["onderwerp"]}
-        
-        Bericht:
-        {data["bericht"]}
-        '''
-        
-        mail.send(msg)
+
         # Bericht opslaan in de database
         contact_msg = ContactMessage(
             naam=data["naam"],
@@ -585,61 +2790,491 @@ def contact():
             voorkeur_contact=data.get("voorkeurContact", "")
         )
         db.session.add(contact_msg)
-        db.session.commit()
-        # Automatische bevestiging naar de afzender
-        confirmation = Message(
-            subject='Ontvangstbevestiging - Risk Pro Actief',
-            recipients=[data["email"]]
+
+        # E-mail bericht samenstellen
+        queue_mail(
+            f'Nieuw contactformulier: {contact_msg.onderwerp}',
+            [os.environ.get('CONTACT_EMAIL', 'default@riskproactief.nl')],
+            f'''
+        Naam: {contact_msg.naam}
+        E-mail: {contact_msg.email}
+        Telefoon: {contact_msg.telefoon}
+        Voorkeur contact: {contact_msg.voorkeur_contact}
+        Onderwerp: {contact_msg.onderwerp}
+
+        Bericht:
+        {contact_msg.bericht}
+        '''
         )
-        
-        confirmation.body = f'''
-        Beste {data["naam"]},
-        
+
+        # Automatische bevestiging naar de afzender
+        queue_mail(
+            'Ontvangstbevestiging - Risk Pro Actief',
+            [contact_msg.email],
+            f'''
+        Beste {contact_msg.naam},
+
         Bedankt voor uw bericht. Wij hebben uw aanvraag in goede orde ontvangen.
-        
-        Wij streven ernaar om binnen 24 uur contact met u op te nemen via {data["voorkeurContact"]}.
-        
+
+        Wij streven ernaar om binnen 24 uur contact met u op te nemen via {contact_msg.voorkeur_contact}.
+
         Met vriendelijke groet,
         Risk Pro Actief Team
         '''
-        
-        mail.send(confirmation)
-        
+        )
+
+        # Bericht en mails in één transactie; versturen gebeurt door de mail worker
+        db.session.commit()
+        events.publish('contact.created', {'id': contact_msg.id})
+
         return jsonify({'message': 'Bericht succesvol verzonden'}), 200
-        
+
     except Exception as e:
+        db.session.rollback()
         print('Error:', str(e))  # Voor debugging
         return jsonify({'error': 'Er is een fout opgetreden'}), 500
 
+# Bulk export/import voor de backoffice (alleen admin)
+def _parse_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+# Grenzen van een 64-bit INTEGER kolom; grotere waarden laten de driver falen
+MAX_IMPORT_INT = 2 ** 63 - 1
+
+def _parse_int(value):
+    number = int(value)
+    if not -MAX_IMPORT_INT - 1 <= number <= MAX_IMPORT_INT:
+        raise ValueError('Getal buiten bereik')
+    return number
+
+def _parse_float(value):
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError('Geen eindig getal')
+    return number
+
+BULK_RESOURCES = {
+    'policies': {
+        'model': lambda: Policy,
+        'fields': {
+            'id': _parse_int, 'user_id': _parse_int, 'type': str, 'dekking': str, 'premie': _parse_float,
+            'eigen_risico': _parse_float, 'vervaldatum': _parse_datetime, 'status': str, 'beschrijving': str,
+        },
+        'required': ('user_id', 'type', 'dekking', 'premie', 'eigen_risico', 'vervaldatum'),
+        'references': {'user_id': lambda: User},
+    },
+    'claims': {
+        'model': lambda: Claim,
+        'fields': {'id': _parse_int, 'policy_id': _parse_int, 'user_id': _parse_int, 'status': str, 'document_url': str},
+        'required': ('policy_id', 'user_id'),
+        'references': {'policy_id': lambda: Policy, 'user_id': lambda: User},
+    },
+    'payments': {
+        'model': lambda: Payment,
+        'fields': {
+            'id': _parse_int, 'policy_id': _parse_int, 'status': str, 'bedrag': _parse_float, 'betaaldatum': _parse_datetime,
+            'vervaldatum': _parse_datetime,
+        },
+        'required': ('policy_id', 'bedrag'),
+        'references': {'policy_id': lambda: Policy},
+    },
+}
+
+def _admin_error():
+    user = current_user_identity()
+    if not user or user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    return None
+
+def _export_rows(spec):
+    model = spec['model']()
+    columns = [getattr(model, name) for name in spec['fields']]
+    # Server-side cursor: rijen komen in batches binnen, niet als één lijst
+    result = db.session.execute(
+        db.select(*columns).order_by(model.id),
+        execution_options={'yield_per': current_app.config['BULK_CHUNK_SIZE']}
+    )
+    for row in result:
+        yield {name: iso_datetime(value) if isinstance(value, datetime) else value
+               for name, value in zip(spec['fields'], row)}
+
+def _export_ndjson(spec):
+    for row in _export_rows(spec):
+        yield current_app.json.dumps(row) + '\n'
+
+def _export_csv(spec):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(spec['fields']))
+    writer.writeheader()
+    for i, row in enumerate(_export_rows(spec), 1):
+        writer.writerow(row)
+        if i % current_app.config['BULK_CHUNK_SIZE'] == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@api.route('/api/export/<resource>', methods=['GET'])
+@jwt_required()
+def export_resource(resource):
+    error = _admin_error()
+    if error:
+        return error
+    spec = BULK_RESOURCES.get(resource)
+    if not spec:
+        return jsonify({'message': 'Onbekende resource'}), 404
+    if request.args.get('format', 'ndjson') == 'csv':
+        body, mimetype = _export_csv(spec), 'text/csv'
+    else:
+        body, mimetype = _export_ndjson(spec), 'application/x-ndjson'
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={resource}.{"csv" if mimetype == "text/csv" else "ndjson"}'
+    return response
+
+def _read_import_rows():
+    """Lees (regelnummer, dict of fout) uit de request body zonder die volledig te bufferen."""
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    if request.args.get('format') == 'csv' or request.mimetype == 'text/csv':
+        reader = csv.DictReader(stream)
+        for line, row in enumerate(reader, 2):
+            yield line, {k: (v if v != '' else None) for k, v in row.items()}
+        return
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            row = current_app.json.loads(text)
+        except ValueError:
+            yield line, ValueError('Ongeldige JSON')
+            continue
+        yield line, row if isinstance(row, dict) else ValueError('Regel is geen JSON object')
+
+def _validate_import_row(spec, raw):
+    if isinstance(raw, Exception):
+        raise raw
+    values = {}
+    for name, convert in spec['fields'].items():
+        value = raw.get(name)
+        if value is None:
+            continue
+        try:
+            values[name] = convert(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f'Ongeldige waarde voor {name}')
+    missing = [name for name in spec['required'] if values.get(name) is None]
+    if missing and 'id' not in values:
+        raise ValueError(f'Verplichte velden ontbreken: {", ".join(missing)}')
+    return values
+
+def _import_chunk(spec, chunk, report):
+    """Upsert één chunk in één transactie; rijen met fouten worden overgeslagen."""
+    model = spec['model']()
+    rows = []
+    for line, raw in chunk:
+        try:
+            rows.append((line, _validate_import_row(spec, raw)))
+        except ValueError as e:
+            _import_error(report, line, str(e))
+
+    # Bestaande rijen en verwijzingen met één query per tabel opzoeken
+    ids = {values['id'] for _, values in rows if 'id' in values}
+    existing = {obj.id: obj for obj in model.query.filter(model.id.in_(ids))} if ids else {}
+    known = {}
+    for field, target in spec['references'].items():
+        wanted = {values[field] for _, values in rows if field in values}
+        target_model = target()
+        known[field] = set(db.session.execute(
+            db.select(target_model.id).where(target_model.id.in_(wanted))
+        ).scalars()) if wanted else set()
+
+    pending = []
+    for line, values in rows:
+        bad = [field for field in spec['references'] if field in values and values[field] not in known[field]]
+        if bad:
+            _import_error(report, line, f'Onbekende verwijzing: {", ".join(bad)}')
+            continue
+        obj = existing.get(values.get('id'))
+        if obj is None:
+            missing = [name for name in spec['required'] if values.get(name) is None]
+            if missing:
+                _import_error(report, line, f'Verplichte velden ontbreken: {", ".join(missing)}')
+                continue
+            obj = model(**values)
+            db.session.add(obj)
+            if 'id' in values:
+                existing[values['id']] = obj
+            pending.append((line, values, 'inserted'))
+        else:
+            for name, value in values.items():
+                setattr(obj, name, value)
+            pending.append((line, values, 'updated'))
+
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # Terugvallen op rij-voor-rij met savepoints om de foute rij(en) te vinden; rijen
+        # die hierboven al als fout gemeld zijn doen niet meer mee
+        _import_rows_individually(spec, [(line, values) for line, values, _ in pending], report)
+        return
+    for _, _, outcome in pending:
+        report[outcome] += 1
+
+def _import_rows_individually(spec, rows, report):
+    model = spec['model']()
+    for line, values in rows:
+        try:
+            with db.session.begin_nested():
+                obj = db.session.get(model, values['id']) if 'id' in values else None
+                if obj is None:
+                    db.session.add(model(**values))
+                    outcome = 'inserted'
+                else:
+                    for name, value in values.items():
+                        setattr(obj, name, value)
+                    outcome = 'updated'
+            report[outcome] += 1
+        except Exception as e:
+            _import_error(report, line, str(getattr(e, 'orig', e)))
+    db.session.commit()
+
+def _import_error(report, line, message):
+    report['failed'] += 1
+    if len(report['errors']) < current_app.config['BULK_MAX_REPORTED_ERRORS']:
+        report['errors'].append({'line': line, 'error': message})
+
+@api.route('/api/import/<resource>', methods=['POST'])
+@jwt_required()
+def import_resource(resource):
+    error = _admin_error()
+    if error:
+        return error
+    spec = BULK_RESOURCES.get(resource)
+    if not spec:
+        return jsonify({'message': 'Onbekende resource'}), 404
+
+    report = {'inserted': 0, 'updated': 0, 'failed': 0, 'errors': []}
+    chunk = []
+    for item in _read_import_rows():
+        chunk.append(item)
+        if len(chunk) >= current_app.config['BULK_CHUNK_SIZE']:
+            _import_chunk(spec, chunk, report)
+            chunk = []
+    if chunk:
+        _import_chunk(spec, chunk, report)
+    report['errors'].sort(key=lambda e: e['line'])
+    return jsonify(report), 200
+
 # Admin-only endpoint om alle gebruikers op te halen
-from flask_jwt_extended import get_jwt_identity
 
-@app.route('/api/users', methods=['GET'])
+# Admin lijsten: sparse fieldsets (?fields=id,naam), sortering (?sort=-created_at,naam) en
+# paginering (?page=&per_page=). Alleen de gevraagde kolommen worden geselecteerd; er worden
+# geen ORM objecten opgebouwd
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 500
+USER_LIST_COLUMNS = {name: getattr(User, name) for name in ('id', 'email', 'name', 'role', 'created_at')}
+USER_LIST_DEFAULT_FIELDS = ('id', 'email', 'name', 'role')
+CONTACT_LIST_COLUMNS = {
+    name: getattr(ContactMessage, name)
+    for name in ('id', 'naam', 'email', 'telefoon', 'onderwerp', 'bericht', 'voorkeur_contact', 'created_at')
+}
+CONTACT_LIST_DEFAULT_FIELDS = tuple(CONTACT_LIST_COLUMNS)
+
+def list_fields(columns, default_fields, args=None):
+    requested = (request.args if args is None else args).get('fields')
+    if not requested:
+        return list(default_fields)
+    fields = list(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in columns]
+    if unknown:
+        raise ValueError(f'Onbekende velden: {", ".join(unknown)}')
+    return fields if 'id' in fields else ['id'] + fields
+
+def _list_order(columns, sort):
+    order = []
+    for key in sort.split(','):
+        name = key.strip().lstrip('-')
+        if name not in columns:
+            raise ValueError(f'Onbekend sorteerveld: {name}')
+        order.append(columns[name].desc() if key.strip().startswith('-') else columns[name].asc())
+    # id als laatste sleutel zodat de volgorde (en dus elke pagina) stabiel is
+    if 'id' not in {key.strip().lstrip('-') for key in sort.split(',')}:
+        order.append(columns['id'].desc() if sort.strip().startswith('-') else columns['id'].asc())
+    return order
+
+def page_args(args=None, default_per_page=LIST_PAGE_SIZE, max_per_page=LIST_MAX_PAGE_SIZE):
+    """(page, per_page) uit ?page=&per_page=, begrensd; ValueError bij ongeldige invoer."""
+    args = request.args if args is None else args
+    try:
+        page = max(int(args.get('page', 1)), 1)
+        per_page = min(max(int(args.get('per_page', default_per_page)), 1), max_per_page)
+    except (TypeError, ValueError):
+        raise ValueError('Ongeldige paginering')
+    return page, per_page
+
+def list_page(columns, default_fields, default_sort, args=None):
+    """Eén pagina {items, page, per_page, has_more}; ValueError bij onbekende velden."""
+    args = request.args if args is None else args
+    fields = list_fields(columns, default_fields, args)
+    page, per_page = page_args(args)
+    rows = db.session.execute(
+        db.select(*(columns[name] for name in fields))
+        .order_by(*_list_order(columns, args.get('sort') or default_sort))
+        .limit(per_page + 1)
+        .offset((page - 1) * per_page)
+    ).all()
+    return {
+        'items': [dict(zip(fields, row)) for row in rows[:per_page]],
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(rows) > per_page,
+    }
+
+@api.route('/api/users', methods=['GET'])
 @jwt_required()
 def get_users():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_user_identity()
     if not user or user.role != 'admin':
         return jsonify({'msg': 'Admin privileges required'}), 403
-    users = User.query.all()
-    return jsonify([{
-        'id': u.id,
-        'email': u.email,
-        'name': u.name,
-        'role': u.role
-    } for u in users])
+    etag = resource_etag('users')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        result = list_page(USER_LIST_COLUMNS, USER_LIST_DEFAULT_FIELDS, 'id')
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return with_etag(jsonify(result), etag)
 
 # Admin-only endpoint om alle contactberichten op te halen
-@app.route('/api/contact', methods=['GET'])
+@api.route('/api/contact', methods=['GET'])
 @jwt_required()
 def get_contact_messages():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_user_identity()
+    if not user or user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    etag = resource_etag('contact')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        result = list_page(CONTACT_LIST_COLUMNS, CONTACT_LIST_DEFAULT_FIELDS, '-created_at')
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return with_etag(jsonify(result), etag), 200
+
+# Zoeken in contactberichten (alleen admin)
+def _contact_search_available():
+    # Alleen een positieve uitkomst cachen: na migratie 3 werkt zoeken dan zonder herstart
+    if not current_app.extensions.get('contact_search'):
+        current_app.extensions['contact_search'] = db.engine.dialect.name == 'sqlite' and \
+            inspect(db.engine).has_table(CONTACT_SEARCH_TABLE)
+    return current_app.extensions['contact_search']
+
+def _fts_query(text):
+    """Zet vrije invoer om in een veilige FTS5 query: alle woorden moeten voorkomen, als prefix."""
+    terms = re.findall(r'\w+', text.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+@api.route('/api/contact/search', methods=['GET'])
+@jwt_required()
+def search_contact_messages():
+    user = current_user_identity()
     if not user or user.role != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
-    messages = ContactMessage.query.order_by(ContactMessage.created_at.desc()).all()
-    return jsonify([msg.to_dict() for msg in messages]), 200
+    query = _fts_query(request.args.get('q', ''))
+    if not query:
+        return jsonify({'message': 'Zoekterm is verplicht'}), 400
+    try:
+        page, per_page = page_args(default_per_page=25, max_per_page=100)
+        fields = list_fields(CONTACT_LIST_COLUMNS, CONTACT_LIST_DEFAULT_FIELDS)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    etag = resource_etag('contact')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    if _contact_search_available():
+        # bm25: lagere score is relevanter; onderwerp en naam wegen zwaarder dan de berichttekst
+        rows = db.session.execute(db.text(
+            f'SELECT rowid, bm25({CONTACT_SEARCH_TABLE}, 4.0, 3.0, 5.0, 1.0) AS score '
+            f'FROM {CONTACT_SEARCH_TABLE} WHERE {CONTACT_SEARCH_TABLE} MATCH :query '
+            'ORDER BY score, rowid DESC LIMIT :limit OFFSET :offset'
+        ), {'query': query, 'limit': per_page + 1, 'offset': (page - 1) * per_page}).all()
+        ids = [row.rowid for row in rows[:per_page]]
+    else:
+        # Andere databases: LIKE op alle kolommen, nieuwste eerst
+        conditions = [
+            db.or_(*(getattr(ContactMessage, c).ilike(f'%{term}%') for c in CONTACT_SEARCH_COLUMNS))
+            for term in re.findall(r'\w+', request.args['q'])
+        ]
+        rows = db.session.execute(
+            db.select(ContactMessage.id).where(*conditions).order_by(ContactMessage.created_at.desc())
+            .limit(per_page + 1).offset((page - 1) * per_page)
+        ).all()
+        ids = [row.id for row in rows[:per_page]]
+
+    messages = {
+        row.id: dict(zip(fields, row)) for row in db.session.execute(
+            db.select(*(CONTACT_LIST_COLUMNS[name] for name in fields)).where(ContactMessage.id.in_(ids))
+        )
+    } if ids else {}
+    return with_etag(jsonify({
+        'items': [messages[i] for i in ids if i in messages],
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(rows) > per_page,
+    }), etag), 200
+
+def create_app(config=None):
+    """Maak en configureer de app.
+
+    Doet geen database I/O: engines verbinden pas bij de eerste query. Het schema wordt
+    bijgewerkt met migrate.py en demo data komt uit seed.py.
+    """
+    load_dotenv()
+    app = Flask(__name__)
+    load_config(app)
+    if config:
+        app.config.update(config)
+    if app.config['JSON_PROVIDER'] == 'orjson' and orjson is None:
+        app.config['JSON_PROVIDER'] = 'default'
+    app.json = JSON_PROVIDERS[app.config['JSON_PROVIDER']](app)
+    app.request_class = UploadRequest
+
+    db.init_app(app)
+    mail.init_app(app)
+    jwt.init_app(app)
+    CORS(
+        app,
+        resources={
+            r"/api/*": {
+                "origins": [
+                    "https://insurance-advisor-portal.vercel.app",
+                    "http://localhost:5175"
+                ],
+                "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+                "allow_headers": ["Content-Type", "Authorization"]
+            }
+        }
+    )
+    identity_cache.maxsize = app.config['IDENTITY_CACHE_SIZE']
+    identity_cache.ttl = app.config['IDENTITY_CACHE_TTL']
+    password_hasher.init_app(app)
+    events.init_app(app)
+    shared_metrics.init_app(app)
+    with app.app_context():
+        if 'SQLITE_PRAGMAS' in app.config:
+            configure_sqlite_engine(db.engine, app.config['SQLITE_PRAGMAS'])
+        instrument_engine(db.engine)
+
+    app.register_blueprint(api)
+    return app
 
 if __name__ == '__main__':
-    init_db()
+    app = create_app()
+    with app.app_context():
+        prepare_database()
+        seed_demo_data()
     app.run(host='0.0.0.0', port=5002, debug=os.environ.get('FLASK_ENV') == 'development')
@@ -0,0 +1,91 @@
+"""Boekhouding: rapportages uit rollups en policy_balances tegenover aggregeren over alle betalingen.
+
+Vult een tijdelijke SQLite database met generate_data, bouwt de saldi op met één
+INSERT ... SELECT en vergelijkt de /api/accounting endpoints met dezelfde cijfers
+rechtstreeks uit de payments tabel.
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.accounting --payments 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def _timed(fn, repeat=1):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None or elapsed < best else best
+    return result, round(best * 1000, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payments', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        from app import Payment, Policy, User, create_app, db, rebuild_policy_balances, rebuild_statistics
+        from generate_data import generate
+        from sqlalchemy import func
+
+        counts = {
+            'users': max(args.payments // 40, 10), 'policies': max(args.payments // 10, 10),
+            'payments': args.payments, 'claims': 0, 'appointments': 0, 'contact_messages': 0,
+        }
+        app = create_app()
+        report = {'payments': args.payments}
+        with app.app_context():
+            generate(db.engine.url.render_as_string(hide_password=False), counts, seed=args.seed)
+            admin = User(email='bench-admin@example.nl', name='Bench Admin', role='admin')
+            admin.set_password('welkom123')
+            db.session.add(admin)
+            db.session.commit()
+            _, report['rebuild_statistics_ms'] = _timed(rebuild_statistics)
+
+            def balances():
+                rebuild_policy_balances()
+                db.session.commit()
+            _, report['rebuild_policy_balances_ms'] = _timed(balances)
+
+            # Zelfde cijfers zonder bijgehouden tabellen: elke keer alle betalingen aggregeren
+            paid = Payment.status == 'betaald'
+            def scan_months():
+                month = func.strftime('%Y-%m', func.coalesce(Payment.vervaldatum, Payment.betaaldatum))
+                return db.session.execute(
+                    db.select(month, func.sum(Payment.bedrag)).group_by(month)
+                ).all()
+            def scan_customers():
+                return db.session.execute(
+                    db.select(Policy.user_id, func.sum(Payment.bedrag), func.sum(Payment.bedrag).filter(paid))
+                    .join(Policy, Policy.id == Payment.policy_id)
+                    .group_by(Policy.user_id).order_by(Policy.user_id).limit(50)
+                ).all()
+            _, months_ms = _timed(scan_months, args.repeat)
+            _, customers_ms = _timed(scan_customers, args.repeat)
+            report['scan_payments'] = {'months_ms': months_ms, 'customers_page_ms': customers_ms}
+
+        client = app.test_client()
+        token = client.post('/api/auth/login', json={
+            'email': 'bench-admin@example.nl', 'password': 'welkom123',
+        }).get_json()['token']
+        headers = {'Authorization': f'Bearer {token}'}
+        report['endpoints'] = {}
+        for path in ('/api/accounting/summary?months=24', '/api/accounting/customers',
+                     '/api/accounting/policies?limit=200'):
+            response, ms = _timed(lambda: client.get(path, headers=headers), args.repeat)
+            report['endpoints'][path] = {'status': response.status_code, 'ms': ms}
+        with app.app_context():
+            db.engine.dispose()
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Cold start per worker: tijd tot de app geïmporteerd is en tot de eerste afgehandelde request.
+
+Elke meting is een vers Python proces (zoals een nieuwe gunicorn worker) tegen een bestaande
+database, zodat alleen de opstartkosten van de app zelf worden gemeten.
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.cold_start --runs 10 --target wsgi:app
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = '''
+import importlib, json, sys, time
+started = time.perf_counter()
+module_name, _, attr = sys.argv[1].partition(':')
+module = importlib.import_module(module_name)
+target = getattr(module, attr)
+application = target if hasattr(target, 'wsgi_app') else target()  # WSGI app of factory
+imported = time.perf_counter()
+response = application.test_client().get('/health')
+response.get_data()
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'first_request_ms': (done - imported) * 1000,
+                  'status': response.status_code}))
+'''
+
+def _probe(target, env):
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE, target], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--target', default='wsgi:app', help='module:attribuut met de WSGI app of factory')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tmp, 'bench.db'))
+        subprocess.run([sys.executable, 'migrate.py'], env=env, capture_output=True, check=True)
+        # Eerste proces warmt de bytecode cache op; daarna alleen gewone starts meten
+        _probe(args.target, env)
+        samples = [_probe(args.target, env) for _ in range(args.runs)]
+
+    report = {'target': args.target, 'runs': args.runs}
+    for key in ('import_ms', 'first_request_ms'):
+        values = sorted(sample[key] for sample in samples)
+        report[key] = {'median': round(statistics.median(values), 1), 'max': round(values[-1], 1)}
+    report['status_codes'] = sorted({sample['status'] for sample in samples})
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
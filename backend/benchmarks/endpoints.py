@@ -0,0 +1,207 @@
+"""Latency benchmark voor alle API routes op databases van verschillende grootte.
+
+Per grootte wordt een verse SQLite database gevuld (zie generate_data.py) en elke route
+met meerdere threads via de Flask test client aangeroepen. Per route worden p50/p95/p99,
+doorvoer en het aantal SQL statements per request gerapporteerd als JSON, zodat
+resultaten tussen versies vergeleken kunnen worden.
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.endpoints --sizes 1000,10000,100000 --requests 200 --concurrency 4 --output bench.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_PASSWORD = 'welkom123'
+ADMIN_EMAIL = 'bench-admin@example.nl'
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def _summarize(samples, elapsed):
+    durations = sorted(duration for duration, _, _ in samples)
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    statements = [count for _, _, count in samples if count is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status >= 500),
+        'status_codes': statuses,
+        'p50_ms': round(_percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(_percentile(durations, 95) * 1000, 3),
+        'p99_ms': round(_percentile(durations, 99) * 1000, 3),
+        'mean_ms': round(sum(durations) / len(durations) * 1000, 3),
+        'throughput_rps': round(len(samples) / elapsed, 1),
+        'sql_per_request': round(sum(statements) / len(statements), 2) if statements else None,
+    }
+
+def _counts_for_size(size):
+    return {
+        'users': max(size // 10, 10),
+        'policies': max(size // 4, 10),
+        'payments': size,
+        'claims': size,
+        'appointments': max(size // 4, 10),
+        'contact_messages': size,
+    }
+
+def _routes(client_token, admin_token, client_email):
+    client = {'Authorization': f'Bearer {client_token}'}
+    admin = {'Authorization': f'Bearer {admin_token}'}
+    contact = {
+        'naam': 'Bench', 'email': 'bench@example.nl', 'telefoon': '0612345678',
+        'onderwerp': 'Benchmark', 'bericht': 'Benchmark bericht', 'voorkeurContact': 'email',
+    }
+    return {
+        'POST /api/auth/login': ('post', '/api/auth/login', {}, {'email': client_email, 'password': BENCH_PASSWORD}),
+        'GET /api/auth/verify': ('get', '/api/auth/verify', client, None),
+        'GET /api/policies': ('get', '/api/policies', client, None),
+        'GET /api/policies/overview': ('get', '/api/policies/overview', client, None),
+        'GET /api/claims': ('get', '/api/claims', admin, None),
+        'GET /api/claims (client)': ('get', '/api/claims', client, None),
+        'GET /api/appointments': ('get', '/api/appointments', admin, None),
+        'POST /api/contact': ('post', '/api/contact', {}, contact),
+        'GET /api/contact': ('get', '/api/contact', admin, None),
+        'GET /api/users': ('get', '/api/users', admin, None),
+        'GET /api/contact (fields)': ('get', '/api/contact?fields=naam,email,created_at&per_page=50', admin, None),
+        'GET /api/users (fields)': ('get', '/api/users?fields=name&sort=name&per_page=50', admin, None),
+        'GET /api/statistics': ('get', '/api/statistics', admin, None),
+        'GET /api/dashboard': ('get', '/api/dashboard', admin, None),
+        'GET /api/dashboard (client)': ('get', '/api/dashboard', client, None),
+        'GET /api/accounting/summary': ('get', '/api/accounting/summary', admin, None),
+        'GET /api/accounting/customers': ('get', '/api/accounting/customers', admin, None),
+        'GET /api/accounting/policies (client)': ('get', '/api/accounting/policies', client, None),
+        'GET /api/changes': ('get', '/api/changes?since=0', admin, None),
+        'GET /api/changes (client)': ('get', '/api/changes?since=0', client, None),
+    }
+
+def _drive(call, requests, concurrency):
+    """Voer `call` `requests` keer uit over `concurrency` threads; geeft samples en looptijd."""
+    samples = []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = []
+        for _ in range(n):
+            local.append(call())
+        with lock:
+            samples.extend(local)
+
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(worker, per_thread))
+    return samples, time.perf_counter() - started
+
+def run_size(size, requests, concurrency, seed):
+    """Draait in een eigen proces: DATABASE_URL is dan al naar een lege database gezet."""
+    from sqlalchemy import event
+
+    from app import create_app, db, rebuild_statistics, User
+    from generate_data import generate
+
+    app = create_app()
+    with app.app_context():
+        url = db.engine.url.render_as_string(hide_password=False)
+        generate(url, _counts_for_size(size), seed=seed)
+        admin = User(email=ADMIN_EMAIL, name='Bench Admin', role='admin')
+        admin.set_password(BENCH_PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+        rebuild_statistics()
+        client_email = User.query.filter_by(role='client').order_by(User.id).first().email
+
+        counter = threading.local()
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def _count_statement(*args):
+            counter.statements = getattr(counter, 'statements', 0) + 1
+
+    http = app.test_client()
+
+    def login(email, password):
+        return http.post('/api/auth/login', json={'email': email, 'password': password}).get_json()['token']
+
+    routes = _routes(login(client_email, BENCH_PASSWORD), login(ADMIN_EMAIL, BENCH_PASSWORD), client_email)
+    results = {}
+    for name, (method, path, headers, body) in routes.items():
+        def call():
+            client = app.test_client()
+            counter.statements = 0
+            started = time.perf_counter()
+            try:
+                response = getattr(client, method)(path, headers=headers, json=body)
+                response.get_data()
+                status = response.status_code
+            except Exception:
+                # PROPAGATE_EXCEPTIONS laat fouten door de test client heen komen
+                status = 500
+            return time.perf_counter() - started, status, counter.statements
+
+        for _ in range(min(5, requests)):
+            call()
+        samples, elapsed = _drive(call, requests, concurrency)
+        results[name] = _summarize(samples, elapsed)
+    return results
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='aantal claims/betalingen/berichten per run')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='schrijf JSON naar dit bestand in plaats van stdout')
+    parser.add_argument('--single-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single_size:
+        print(json.dumps(run_size(args.single_size, args.requests, args.concurrency, args.seed)))
+        return
+
+    report = {
+        'revision': _git_revision(),
+        'requests_per_route': args.requests,
+        'concurrency': args.concurrency,
+        'sizes': {},
+    }
+    for size in (int(value) for value in args.sizes.split(',')):
+        # Elke grootte in een eigen proces met een eigen DATABASE_URL, zodat caches, engine
+        # pools en worker threads van een vorige grootte de meting niet beïnvloeden
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tmp, 'bench.db'))
+            result = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.endpoints', '--single-size', str(size),
+                 '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+                 '--seed', str(args.seed)],
+                env=env, capture_output=True, text=True, check=True
+            )
+        report['sizes'][str(size)] = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f'grootte {size} klaar', file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
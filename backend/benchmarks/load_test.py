@@ -0,0 +1,192 @@
+"""HTTP load test: gunicorn (gunicorn.conf.py) tegenover de Flask dev server.
+
+Per server wordt een verse SQLite database gevuld (zie generate_data.py), de server als
+apart proces gestart en met keep-alive verbindingen vanuit meerdere threads belast met
+een mix van lees-, schrijf- en login requests.
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.load_test --seconds 20 --clients 16 --size 10000
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.endpoints import ADMIN_EMAIL, BENCH_PASSWORD, _percentile
+
+DEV_SERVER = (
+    "from wsgi import app; "
+    "app.run(host='127.0.0.1', port={port}, threaded=True, debug=False, use_reloader=False)"
+)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _prepare(env, size, seed):
+    script = (
+        'from app import create_app, db, prepare_database, rebuild_statistics, User\n'
+        'from benchmarks.endpoints import _counts_for_size\n'
+        'from generate_data import generate\n'
+        'app = create_app()\n'
+        'with app.app_context():\n'
+        '    prepare_database()\n'
+        f'    generate(db.engine.url.render_as_string(hide_password=False), _counts_for_size({size}), seed={seed})\n'
+        f'    admin = User(email={ADMIN_EMAIL!r}, name="Bench Admin", role="admin")\n'
+        f'    admin.set_password({BENCH_PASSWORD!r})\n'
+        '    db.session.add(admin)\n'
+        '    db.session.commit()\n'
+        '    rebuild_statistics()\n'
+        '    print(User.query.filter_by(role="client").order_by(User.id).first().email)\n'
+    )
+    result = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, check=True)
+    return result.stdout.strip().splitlines()[-1]
+
+def _wait_until_up(port, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('server is gestopt tijdens het opstarten')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server reageert niet')
+
+def _request(connection, method, path, headers, body=None):
+    payload = json.dumps(body) if body is not None else None
+    if payload:
+        headers = dict(headers, **{'Content-Type': 'application/json'})
+    connection.request(method, path, body=payload, headers=headers)
+    response = connection.getresponse()
+    data = response.read()
+    return response.status, data
+
+def _token(port, email):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    status, data = _request(connection, 'POST', '/api/auth/login', {}, {'email': email, 'password': BENCH_PASSWORD})
+    return json.loads(data)['token']
+
+def _mix(client_token, admin_token, client_email):
+    client = {'Authorization': f'Bearer {client_token}'}
+    admin = {'Authorization': f'Bearer {admin_token}'}
+    contact = {
+        'naam': 'Load', 'email': 'load@example.nl', 'telefoon': '0612345678',
+        'onderwerp': 'Load test', 'bericht': 'Load test bericht', 'voorkeurContact': 'email',
+    }
+    # (gewicht, naam, method, path, headers, body)
+    return [
+        (30, 'GET /api/policies/overview', 'GET', '/api/policies/overview', client, None),
+        (20, 'GET /api/claims', 'GET', '/api/claims', admin, None),
+        (15, 'GET /api/appointments', 'GET', '/api/appointments', client, None),
+        (10, 'GET /api/statistics', 'GET', '/api/statistics', admin, None),
+        (10, 'GET /api/contact/search', 'GET', '/api/contact/search?q=polis', admin, None),
+        (10, 'POST /api/contact', 'POST', '/api/contact', {}, contact),
+        (5, 'POST /api/auth/login', 'POST', '/api/auth/login', {}, {'email': client_email, 'password': BENCH_PASSWORD}),
+    ]
+
+def _load(port, mix, clients, seconds, seed):
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    weights = [entry[0] for entry in mix]
+
+    def client(n):
+        rng = random.Random(seed + n)
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local = []
+        while time.perf_counter() < deadline:
+            _, name, method, path, headers, body = rng.choices(mix, weights)[0]
+            started = time.perf_counter()
+            try:
+                status, _ = _request(connection, method, path, headers, body)
+            except (OSError, http.client.HTTPException):
+                status = 599
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            local.append((name, time.perf_counter() - started, status))
+        connection.close()
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    def summary(rows):
+        durations = sorted(duration for _, duration, _ in rows)
+        return {
+            'requests': len(rows),
+            'errors': sum(1 for _, _, status in rows if status >= 500),
+            'throughput_rps': round(len(rows) / elapsed, 1),
+            'p50_ms': round(_percentile(durations, 50) * 1000, 1),
+            'p95_ms': round(_percentile(durations, 95) * 1000, 1),
+            'p99_ms': round(_percentile(durations, 99) * 1000, 1),
+        }
+
+    routes = {}
+    for _, name, *_ in mix:
+        rows = [row for row in samples if row[0] == name]
+        if rows:
+            routes[name] = summary(rows)
+    return {'total': summary(samples), 'routes': routes}
+
+def run_server(kind, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        port = _free_port()
+        env = dict(
+            os.environ,
+            DATABASE_URL='sqlite:///' + os.path.join(tmp, 'bench.db'),
+            UPLOAD_FOLDER=os.path.join(tmp, 'documents'),
+            GUNICORN_ACCESSLOG='',
+        )
+        client_email = _prepare(env, args.size, args.seed)
+        if kind == 'gunicorn':
+            command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'wsgi:app']
+            if args.workers:
+                command += ['--workers', str(args.workers)]
+        else:
+            command = [sys.executable, '-c', DEV_SERVER.format(port=port)]
+        server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_until_up(port, server)
+            mix = _mix(_token(port, client_email), _token(port, ADMIN_EMAIL), client_email)
+            _load(port, mix, args.clients, min(2, args.seconds), args.seed)  # opwarmen
+            return _load(port, mix, args.clients, args.seconds, args.seed)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--clients', type=int, default=16, help='gelijktijdige keep-alive verbindingen')
+    parser.add_argument('--size', type=int, default=10000, help='grootte van de dataset (zie benchmarks.endpoints)')
+    parser.add_argument('--workers', type=int, help='overschrijf WEB_CONCURRENCY voor gunicorn')
+    parser.add_argument('--servers', default='dev,gunicorn')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    report = {'clients': args.clients, 'seconds': args.seconds, 'size': args.size, 'cpus': os.cpu_count(), 'servers': {}}
+    for kind in args.servers.split(','):
+        report['servers'][kind] = run_server(kind, args)
+        print(f'{kind} klaar', file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
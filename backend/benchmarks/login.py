@@ -0,0 +1,117 @@
+"""Login doorvoer onder gelijktijdige belasting, en de latency van andere routes tijdens een login piek.
+
+Elke run draait in een eigen proces met een verse SQLite database en de opgegeven
+PASSWORD_HASH_* instellingen. Gebruikers krijgen eerst een hash met --legacy-method, zodat
+ook het eenmalig herhashen bij de eerste login wordt gemeten.
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.login --users 200 --concurrency 16 --hash-workers 1,2,4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.endpoints import BENCH_PASSWORD, _drive, _summarize
+
+def run(args):
+    """Draait in een eigen proces: DATABASE_URL en PASSWORD_HASH_* zijn al gezet."""
+    import threading
+
+    from werkzeug.security import generate_password_hash
+
+    from app import User, create_app, db, password_hasher, prepare_database
+
+    legacy_hash = generate_password_hash(BENCH_PASSWORD, args.legacy_method)
+    app = create_app()
+    with app.app_context():
+        prepare_database()
+        db.session.execute(db.insert(User), [
+            {'email': f'login{i}@example.nl', 'password': legacy_hash, 'name': f'Login {i}', 'role': 'client'}
+            for i in range(args.users)
+        ])
+        db.session.commit()
+
+    emails = iter(f'login{i % args.users}@example.nl' for i in range(10 ** 9))
+    lock = threading.Lock()
+
+    def login():
+        with lock:
+            email = next(emails)
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post('/api/auth/login', json={'email': email, 'password': BENCH_PASSWORD})
+        response.get_data()
+        return time.perf_counter() - started, response.status_code, None
+
+    def health():
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.get('/health')
+        response.get_data()
+        return time.perf_counter() - started, response.status_code, None
+
+    # Andere routes meten terwijl de login piek loopt
+    background = {}
+    storm_started = threading.Event()
+
+    def measure_health():
+        storm_started.wait()
+        samples, elapsed = _drive(health, args.requests, 2)
+        background['samples'], background['elapsed'] = samples, elapsed
+
+    probe = threading.Thread(target=measure_health)
+    probe.start()
+    storm_started.set()
+    samples, elapsed = _drive(login, args.requests, args.concurrency)
+    probe.join()
+
+    with app.app_context():
+        upgraded = User.query.filter(User.password.like(password_hasher.method + '$%')).count()
+    return {
+        'login': _summarize(samples, elapsed),
+        'health_during_logins': _summarize(background['samples'], background['elapsed']),
+        'rehashed_users': upgraded,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=400, help='aantal logins per run')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--hash-workers', default='1,2,4', help='PASSWORD_HASH_WORKERS per run')
+    parser.add_argument('--hash-queue', type=int, default=32)
+    parser.add_argument('--method', default='scrypt:32768:8:1', help='PASSWORD_HASH_METHOD')
+    parser.add_argument('--legacy-method', default='pbkdf2:sha256:600000')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run(args)))
+        return
+
+    report = {'method': args.method, 'legacy_method': args.legacy_method, 'concurrency': args.concurrency, 'runs': {}}
+    for workers in (int(value) for value in args.hash_workers.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                DATABASE_URL='sqlite:///' + os.path.join(tmp, 'bench.db'),
+                PASSWORD_HASH_METHOD=args.method,
+                PASSWORD_HASH_WORKERS=str(workers),
+                PASSWORD_HASH_QUEUE=str(args.hash_queue),
+            )
+            result = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.login', '--single', '--users', str(args.users),
+                 '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+                 '--legacy-method', args.legacy_method],
+                env=env, capture_output=True, text=True, check=True
+            )
+        report['runs'][str(workers)] = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f'hash workers {workers} klaar', file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
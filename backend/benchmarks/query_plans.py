@@ -0,0 +1,136 @@
+"""Query plans en timings voor de filter-/sorteerqueries, voor en na de index migratie.
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.query_plans --rows 200000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from app import db, run_migrations
+
+QUERIES = {
+    'claims_by_user_keyset': (
+        'SELECT * FROM claims WHERE user_id = :user_id AND id < :cursor ORDER BY id DESC LIMIT 51'
+    ),
+    'claims_by_policy': 'SELECT * FROM claims WHERE policy_id = :policy_id ORDER BY id DESC LIMIT 51',
+    'claims_by_status': "SELECT * FROM claims WHERE status = 'approved' ORDER BY id DESC LIMIT 51",
+    'policies_by_user': 'SELECT * FROM policies WHERE user_id = :user_id',
+    'payments_by_policy': 'SELECT * FROM payments WHERE policy_id = :policy_id',
+    'appointments_by_user_range': (
+        'SELECT appointments.*, users.name FROM appointments JOIN users ON users.id = appointments.user_id '
+        'WHERE appointments.user_id = :user_id AND datum > :earliest AND datum < :end ORDER BY datum, appointments.id'
+    ),
+    'appointments_calendar_range': (
+        'SELECT appointments.*, users.name FROM appointments JOIN users ON users.id = appointments.user_id '
+        'WHERE datum > :earliest AND datum < :end ORDER BY datum, appointments.id'
+    ),
+    'appointments_conflicts': (
+        'SELECT * FROM appointments WHERE user_id = :user_id AND datum > :earliest AND datum < :slot_end '
+        'ORDER BY datum'
+    ),
+    'contact_messages_latest': 'SELECT * FROM contact_messages ORDER BY created_at DESC LIMIT 50',
+}
+
+def _seed(engine, rows, seed):
+    rng = random.Random(seed)
+    users = max(rows // 20, 10)
+    policies = max(rows // 4, 10)
+    now = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(db.metadata.tables['users'].insert(), [
+            {'id': i, 'email': f'user{i}@example.nl', 'password': 'x', 'name': f'User {i}',
+             'role': 'client', 'created_at': now}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(db.metadata.tables['policies'].insert(), [
+            {'id': i, 'user_id': rng.randint(1, users), 'type': 'Autoverzekering', 'dekking': 'WA',
+             'premie': 50.0, 'eigen_risico': 250.0, 'vervaldatum': now, 'status': 'actief'}
+            for i in range(1, policies + 1)
+        ])
+        conn.execute(db.metadata.tables['claims'].insert(), [
+            {'policy_id': rng.randint(1, policies), 'user_id': rng.randint(1, users),
+             'status': rng.choice(['pending', 'approved', 'rejected'])}
+            for _ in range(rows)
+        ])
+        conn.execute(db.metadata.tables['payments'].insert(), [
+            {'policy_id': rng.randint(1, policies), 'status': 'betaald', 'bedrag': 50.0,
+             'betaaldatum': now + timedelta(days=rng.randint(0, 365))}
+            for _ in range(rows)
+        ])
+        conn.execute(db.metadata.tables['appointments'].insert(), [
+            {'user_id': rng.randint(1, users), 'datum': now + timedelta(hours=rng.randint(0, 24 * 365)),
+             'onderwerp': 'Adviesgesprek', 'status': 'open'}
+            for _ in range(rows)
+        ])
+        conn.execute(db.metadata.tables['contact_messages'].insert(), [
+            {'naam': 'Naam', 'email': 'mail@example.nl', 'bericht': 'Bericht',
+             'created_at': now + timedelta(minutes=i)}
+            for i in range(rows)
+        ])
+
+def _drop_secondary_indexes(engine):
+    with engine.begin() as conn:
+        names = conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+        )).scalars().all()
+        for name in names:
+            conn.execute(text(f'DROP INDEX {name}'))
+
+def _measure(engine, repeat):
+    params = {
+        'user_id': 7, 'cursor': 10 ** 9, 'policy_id': 7,
+        'start': datetime(2025, 3, 1), 'end': datetime(2025, 4, 1),
+        'earliest': datetime(2025, 3, 1) - timedelta(hours=8),
+        'slot_end': datetime(2025, 3, 3, 11),
+    }
+    results = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            plan = [row[-1] for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql), params)]
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(sql), params).fetchall()
+            elapsed = (time.perf_counter() - started) / repeat
+            results[name] = {
+                'plan': plan,
+                'full_scan': any(step.startswith('SCAN') and 'USING' not in step for step in plan),
+                'ms': round(elapsed * 1000, 3),
+            }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine('sqlite:///' + os.path.join(tmp, 'bench.db'))
+        db.metadata.create_all(engine)
+        _drop_secondary_indexes(engine)
+        _seed(engine, args.rows, args.seed)
+
+        before = _measure(engine, args.repeat)
+        run_migrations(engine)
+        with engine.begin() as conn:
+            conn.execute(text('ANALYZE'))
+        after = _measure(engine, args.repeat)
+        engine.dispose()
+
+    print(json.dumps({
+        'rows': args.rows,
+        'queries': {
+            name: {'before': before[name], 'after': after[name]} for name in QUERIES
+        },
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
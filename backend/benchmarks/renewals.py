@@ -0,0 +1,60 @@
+"""Verloopscan: nachtelijke run over veel polissen, een herhaalde run en een hervatte run.
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.renewals --policies 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--policies', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        from app import JobCheckpoint, MailOutbox, RENEWAL_JOB, create_app, db, scan_expiring_policies
+        from generate_data import NOW, generate
+
+        counts = {
+            'users': max(args.policies // 4, 10), 'policies': args.policies,
+            'payments': 0, 'claims': 0, 'appointments': 0, 'contact_messages': 0,
+        }
+        today = date(NOW.year, NOW.month, NOW.day)
+        report = {'policies': args.policies, 'batch_size': args.batch_size}
+        with create_app().app_context():
+            generate(db.engine.url.render_as_string(hide_password=False), counts, seed=args.seed)
+
+            def run(label, **kwargs):
+                started = time.perf_counter()
+                checkpoint = scan_expiring_policies(today, batch_size=args.batch_size, **kwargs)
+                report[label] = {
+                    'seconds': round(time.perf_counter() - started, 2),
+                    'scanned': checkpoint.processed,
+                    'queued': checkpoint.queued,
+                }
+
+            run('first_run')
+            # Zelfde dag opnieuw vanaf het begin: alles is al verstuurd
+            run('rerun', restart=True)
+            # Afgebroken run simuleren: checkpoint halverwege terugzetten en hervatten
+            checkpoint = db.session.get(JobCheckpoint, RENEWAL_JOB)
+            scanned = checkpoint.processed
+            checkpoint.finished_at = None
+            db.session.commit()
+            run('resume_after_finish')
+            report['outbox'] = MailOutbox.query.count()
+            report['scanned_of_total'] = round(scanned / args.policies, 3)
+            db.engine.dispose()
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
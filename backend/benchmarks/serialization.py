@@ -0,0 +1,89 @@
+"""Serialisatie en compressie van grote /api/claims en /api/contact payloads.
+
+Vergelijkt de standaard JSON provider met orjson (indien geïnstalleerd) en meet
+gzip/brotli compressie van het resultaat. Er is geen database nodig: de rijen zijn
+transient model objecten. Elke payload heeft de vorm die het endpoint nu teruggeeft: claims
+via to_dict(), contactberichten als kolom-dicts zoals list_page() ze bouwt (één pagina van
+--rows berichten).
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.serialization --rows 50000
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+from app import CONTACT_LIST_DEFAULT_FIELDS, JSON_PROVIDERS, Claim, ContactMessage, brotli, create_app, orjson
+
+def _claims(rows):
+    return [
+        Claim(id=i, policy_id=i // 3 + 1, user_id=i // 10 + 1,
+              status=('pending', 'approved', 'rejected')[i % 3],
+              document_url=f'/documents/claim-{i}.pdf' if i % 4 else None)
+        for i in range(1, rows + 1)
+    ]
+
+def _messages(rows):
+    start = datetime(2025, 1, 1)
+    return [
+        ContactMessage(id=i, naam=f'Klant {i}', email=f'klant{i}@example.nl', telefoon='0612345678',
+                       onderwerp='Vraag over polis', voorkeur_contact='email',
+                       bericht='Graag zou ik meer informatie ontvangen over de dekking van mijn polis. ' * 3,
+                       created_at=start + timedelta(minutes=i))
+        for i in range(1, rows + 1)
+    ]
+
+def _time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None or elapsed < best else best
+    return result, round(best * 1000, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = {
+        '/api/claims': lambda objs: {'items': [c.to_dict() for c in objs], 'next_cursor': None},
+        '/api/contact': lambda objs: {
+            'items': [{name: getattr(m, name) for name in CONTACT_LIST_DEFAULT_FIELDS} for m in objs],
+            'page': 1,
+            'per_page': len(objs),
+            'has_more': False,
+        },
+    }
+    objects = {'/api/claims': _claims(args.rows), '/api/contact': _messages(args.rows)}
+
+    report = {'rows': args.rows, 'endpoints': {}}
+    app = create_app()
+    with app.app_context():
+        for endpoint, build in payloads.items():
+            payload, to_dict_ms = _time(lambda: build(objects[endpoint]), args.repeat)
+            result = {'to_dict_ms': to_dict_ms, 'providers': {}, 'compression': {}}
+            body = None
+            for name, provider_class in JSON_PROVIDERS.items():
+                if name == 'orjson' and orjson is None:
+                    continue
+                provider = provider_class(app)
+                response, ms = _time(lambda: provider.response(payload), args.repeat)
+                body = response.get_data()
+                result['providers'][name] = {'dumps_ms': ms, 'bytes': len(body)}
+
+            _, ms = _time(lambda: gzip.compress(body, compresslevel=6, mtime=0), args.repeat)
+            result['compression']['gzip'] = {'ms': ms, 'bytes': len(gzip.compress(body, compresslevel=6, mtime=0))}
+            if brotli is not None:
+                compressed, ms = _time(lambda: brotli.compress(body, quality=6), args.repeat)
+                result['compression']['br'] = {'ms': ms, 'bytes': len(compressed)}
+            report['endpoints'][endpoint] = result
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
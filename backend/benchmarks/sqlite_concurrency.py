@@ -0,0 +1,111 @@
+"""Doorvoer van gemengde lees-/schrijfbelasting op SQLite, standaard vs. getunede PRAGMA's.
+
+Elke worker is een apart proces (zoals een gunicorn worker) met een eigen engine.
+
+Gebruik (vanuit backend/):
+    python -m benchmarks.sqlite_concurrency --workers 4 --seconds 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+
+from app import configure_sqlite_engine, db, sqlite_pragmas
+
+def _engine(path, tuned):
+    engine = create_engine('sqlite:///' + path)
+    if tuned:
+        configure_sqlite_engine(engine, sqlite_pragmas())
+    return engine
+
+def _prepare(path, users, policies):
+    engine = _engine(path, tuned=False)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(db.metadata.tables['users'].insert(), [
+            {'id': i, 'email': f'user{i}@example.nl', 'password': 'x', 'name': f'User {i}', 'role': 'client'}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(db.metadata.tables['policies'].insert(), [
+            {'id': i, 'user_id': (i % users) + 1, 'type': 'Autoverzekering', 'dekking': 'WA',
+             'premie': 50.0, 'eigen_risico': 250.0, 'vervaldatum': datetime.utcnow(), 'status': 'actief'}
+            for i in range(1, policies + 1)
+        ])
+    engine.dispose()
+
+def _worker(path, tuned, seconds, write_ratio, users, policies, seed, results):
+    rng = random.Random(seed)
+    claims = db.metadata.tables['claims']
+    engine = _engine(path, tuned)
+    reads = writes = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        user_id = rng.randint(1, users)
+        try:
+            if rng.random() < write_ratio:
+                with engine.begin() as conn:
+                    conn.execute(claims.insert().values(
+                        policy_id=rng.randint(1, policies), user_id=user_id, status='pending'
+                    ))
+                writes += 1
+            else:
+                with engine.connect() as conn:
+                    conn.execute(
+                        select(claims).where(claims.c.user_id == user_id).order_by(claims.c.id.desc()).limit(50)
+                    ).fetchall()
+                reads += 1
+        except OperationalError:
+            # "database is locked"
+            errors += 1
+    engine.dispose()
+    results.put({'reads': reads, 'writes': writes, 'errors': errors})
+
+def run(tuned, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        _prepare(path, args.users, args.policies)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_worker, args=(
+                path, tuned, args.seconds, args.write_ratio, args.users, args.policies, args.seed + i, results
+            ))
+            for i in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        totals = {'reads': 0, 'writes': 0, 'errors': 0}
+        for _ in processes:
+            for key, value in results.get().items():
+                totals[key] += value
+        for process in processes:
+            process.join()
+    totals['ops_per_second'] = round((totals['reads'] + totals['writes']) / args.seconds, 1)
+    totals['writes_per_second'] = round(totals['writes'] / args.seconds, 1)
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--policies', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        'workers': args.workers,
+        'write_ratio': args.write_ratio,
+        'default': run(False, args),
+        'tuned': run(True, args),
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
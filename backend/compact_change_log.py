@@ -0,0 +1,24 @@
+"""Onderhoudsjob: verwijder oude entries uit de change log (/api/changes).
+
+Bijvoorbeeld via cron (vanuit backend/):
+    30 3 * * * python compact_change_log.py
+
+Clients met een cursor van vóór de verwijderde entries krijgen daarna een 410 en laden
+hun gegevens opnieuw volledig.
+"""
+import argparse
+
+from app import create_app, compact_change_log, change_log_horizon
+
+def run_compaction():
+    parser = argparse.ArgumentParser(description='Verwijder oude change log entries')
+    parser.add_argument('--days', type=int, default=None, help='bewaartermijn in dagen (standaard CHANGE_LOG_RETENTION_DAYS)')
+    parser.add_argument('--batch-size', type=int, default=None)
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        deleted = compact_change_log(args.days, args.batch_size)
+        print(f'{deleted} entries verwijderd, cursors tot en met {change_log_horizon()} zijn verlopen')
+
+if __name__ == '__main__':
+    run_compaction()
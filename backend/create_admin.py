@@ -1,17 +1,16 @@
-from app import app, db, User
-from werkzeug.security import generate_password_hash
+from app import create_app, db, User
 
 def create_admin_user():
-    with app.app_context():
+    with create_app().app_context():
         # Check if admin already exists
         admin = User.query.filter_by(email='admin@insurance.com').first()
         if not admin:
             admin = User(
-                naam='Admin',
+                name='Admin',
                 email='admin@insurance.com',
-                wachtwoord=generate_password_hash('admin123'),
-                rol='admin'
+                role='admin'
             )
+            admin.set_password('admin123')
             db.session.add(admin)
             db.session.commit()
             print("Admin gebruiker aangemaakt")
@@ -1,8 +1,9 @@
-from app import app, db
+from app import create_app, prepare_database
 
 def create_tables():
+    app = create_app()
     with app.app_context():
-        db.create_all()
+        prepare_database()
         print("Database tabellen zijn aangemaakt")
 
 if __name__ == '__main__':
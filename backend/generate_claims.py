@@ -1,6 +1,6 @@
 import random
 from faker import Faker
-from app import db, app, User, Policy, Claim
+from app import create_app, db, User, Policy, Claim
 
 fake = Faker('nl_NL')
 
@@ -18,7 +18,7 @@ beschrijvingen = [
 ]
 
 def create_claims(min_claims=2, max_claims=4):
-    with app.app_context():
+    with create_app().app_context():
         users = User.query.filter(User.role != 'admin').all()
         for user in users:
             user_policies = Policy.query.filter_by(user_id=user.id).all()
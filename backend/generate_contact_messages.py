@@ -1,6 +1,6 @@
 import random
 from faker import Faker
-from app import db, app, ContactMessage
+from app import create_app, db, ContactMessage
 
 fake = Faker('nl_NL')
 
@@ -17,7 +17,7 @@ onderwerpen = [
 voorkeuren = ['email', 'telefoon']
 
 def create_messages(n=10):
-    with app.app_context():
+    with create_app().app_context():
         for _ in range(n):
             msg = ContactMessage(
                 naam=fake.name(),
@@ -0,0 +1,258 @@
+"""Genereer grote, consistente testdatasets met bulk inserts.
+
+Voorbeeld (vanuit backend/):
+    python generate_data.py --users 1000000 --policies 2500000 --payments 10000000 --processes 4
+
+Alle rijen worden met core inserts in chunks van --chunk-size per transactie weggeschreven.
+Ids worden vooraf toegekend zodat foreign keys kloppen, ook als chunks parallel in
+meerdere processen worden gegenereerd. Met dezelfde --seed ontstaat dezelfde dataset,
+ongeacht het aantal processen.
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import create_engine, func, select
+from werkzeug.security import generate_password_hash
+
+from app import (
+    GLOBAL_VERSION_KEY, bump_resource_versions, configure_sqlite_engine, create_app, db, rebuild_statistics,
+    run_migrations,
+)
+
+VOORNAMEN = ['Jan', 'Piet', 'Klaas', 'Sanne', 'Eva', 'Lotte', 'Daan', 'Sem', 'Emma', 'Julia',
+             'Lucas', 'Noah', 'Tess', 'Fleur', 'Bram', 'Anna', 'Ruben', 'Lisa', 'Thijs', 'Sophie']
+ACHTERNAMEN = ['de Jong', 'Jansen', 'de Vries', 'van den Berg', 'van Dijk', 'Bakker', 'Janssen',
+               'Visser', 'Smit', 'Meijer', 'de Boer', 'Mulder', 'de Groot', 'Bos', 'Vos', 'Peters']
+POLIS_TYPES = [
+    ('Autoverzekering', 'All-risk', 89.50, 350.00),
+    ('Woonverzekering', 'Opstal en Inboedel', 45.75, 250.00),
+    ('Aansprakelijkheidsverzekering', 'Particulier', 5.95, 0.00),
+    ('Reisverzekering', 'Doorlopend', 4.50, 50.00),
+    ('Bedrijfsautoverzekering', 'WA + Volledig Casco', 120.00, 500.00),
+    ('Zakelijke Aansprakelijkheidsverzekering', 'Zakelijk', 25.00, 250.00),
+]
+ONDERWERPEN = ['Vraag over polis', 'Wijziging doorgeven', 'Nieuwe verzekering', 'Schade melden',
+               'Factuur ontvangen', 'Afspraak maken', 'Overige vraag']
+BERICHTEN = [
+    'Graag zou ik meer informatie ontvangen over de dekking van mijn polis.',
+    'Mijn adres is gewijzigd, kunt u dit aanpassen in uw administratie?',
+    'Ik wil graag een afspraak maken om mijn verzekeringen door te nemen.',
+    'Ik heb schade aan mijn auto en wil weten hoe ik dit kan melden.',
+    'Op mijn laatste factuur staat een bedrag dat ik niet begrijp.',
+]
+AFSPRAAK_ONDERWERPEN = ['Kennismaking', 'Polisbespreking', 'Adviesgesprek', 'Schadebehandeling', 'Jaarlijkse review']
+TABLE_ORDER = ['users', 'policies', 'payments', 'claims', 'appointments', 'contact_messages']
+NOW = datetime(2025, 1, 1)
+
+def _engine(url, pragmas=None):
+    engine = create_engine(url)
+    if engine.dialect.name == 'sqlite' and pragmas:
+        configure_sqlite_engine(engine, pragmas)
+    return engine
+
+def _policy_owner(plan, policy_id):
+    offset = policy_id - plan['policies']['start']
+    return plan['users']['start'] + (offset * 7919) % plan['users']['count']
+
+def _policy_type(policy_id):
+    return POLIS_TYPES[policy_id % len(POLIS_TYPES)]
+
+def _policy_premium(policy_id):
+    return round(_policy_type(policy_id)[2] + (policy_id % 40), 2)
+
+def _random_policy(rng, plan):
+    policies = plan['policies']
+    return rng.randrange(policies['start'], policies['start'] + policies['count'])
+
+def _user_rows(rng, plan, ids):
+    for user_id in ids:
+        voornaam = rng.choice(VOORNAMEN)
+        achternaam = rng.choice(ACHTERNAMEN)
+        yield {
+            'id': user_id,
+            'email': f"{voornaam.lower()}.{achternaam.replace(' ', '').lower()}.{user_id}@example.nl",
+            'password': plan['password_hash'],
+            'name': f'{voornaam} {achternaam}',
+            'role': 'adviseur' if rng.random() < 0.01 else 'client',
+            'created_at': NOW - timedelta(days=rng.randint(0, 3 * 365), seconds=rng.randint(0, 86399)),
+        }
+
+def _policy_rows(rng, plan, ids):
+    for policy_id in ids:
+        policy_type, dekking, _, eigen_risico = _policy_type(policy_id)
+        yield {
+            'id': policy_id,
+            'user_id': _policy_owner(plan, policy_id),
+            'type': policy_type,
+            'dekking': dekking,
+            'premie': _policy_premium(policy_id),
+            'eigen_risico': eigen_risico,
+            'vervaldatum': NOW + timedelta(days=rng.randint(-90, 2 * 365)),
+            'status': 'actief' if rng.random() < 0.85 else 'verlopen',
+            'beschrijving': f'{policy_type} ({dekking})',
+        }
+
+def _payment_rows(rng, plan, ids):
+    for payment_id in ids:
+        policy_id = _random_policy(rng, plan)
+        paid = rng.random() < 0.9
+        betaaldatum = NOW - timedelta(days=rng.randint(0, 2 * 365)) if paid else None
+        yield {
+            'id': payment_id,
+            'policy_id': policy_id,
+            'status': 'betaald' if paid else 'pending',
+            'bedrag': _policy_premium(policy_id),
+            'betaaldatum': betaaldatum,
+            # Betaald: meestal op tijd, soms te laat; open: deels nog niet vervallen, deels achterstallig
+            'vervaldatum': (betaaldatum - timedelta(days=rng.randint(-3, 14)) if paid
+                            else NOW + timedelta(days=rng.randint(-180, 30))),
+        }
+
+def _claim_rows(rng, plan, ids):
+    for claim_id in ids:
+        policy_id = _random_policy(rng, plan)
+        yield {
+            'id': claim_id,
+            'policy_id': policy_id,
+            'user_id': _policy_owner(plan, policy_id),
+            'status': rng.choice(['pending', 'approved', 'rejected']),
+            'document_url': f'/documents/claim-{claim_id}.pdf' if rng.random() > 0.3 else None,
+        }
+
+def _appointment_rows(rng, plan, ids):
+    users = plan['users']
+    for appointment_id in ids:
+        datum = NOW + timedelta(days=rng.randint(-365, 365), hours=rng.randint(8, 17))
+        yield {
+            'id': appointment_id,
+            'user_id': rng.randrange(users['start'], users['start'] + users['count']),
+            'datum': datum.replace(minute=0, second=0),
+            'onderwerp': rng.choice(AFSPRAAK_ONDERWERPEN),
+            'status': 'afgerond' if datum < NOW else 'open',
+            'notities': None,
+        }
+
+def _message_rows(rng, plan, ids):
+    for message_id in ids:
+        voornaam = rng.choice(VOORNAMEN)
+        achternaam = rng.choice(ACHTERNAMEN)
+        yield {
+            'id': message_id,
+            'naam': f'{voornaam} {achternaam}',
+            'email': f"{voornaam.lower()}.{message_id}@example.nl",
+            'telefoon': f'06{rng.randint(10000000, 99999999)}',
+            'onderwerp': rng.choice(ONDERWERPEN),
+            'bericht': rng.choice(BERICHTEN),
+            'voorkeur_contact': rng.choice(['email', 'telefoon']),
+            'created_at': NOW - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)),
+        }
+
+ROW_BUILDERS = {
+    'users': _user_rows,
+    'policies': _policy_rows,
+    'payments': _payment_rows,
+    'claims': _claim_rows,
+    'appointments': _appointment_rows,
+    'contact_messages': _message_rows,
+}
+
+def _insert_chunk(task):
+    url, plan, table_name, first_id, count = task
+    # Seed per chunk zodat de uitkomst niet afhangt van de volgorde of het aantal processen
+    rng = random.Random(f"{plan['seed']}-{table_name}-{first_id}")
+    rows = list(ROW_BUILDERS[table_name](rng, plan, range(first_id, first_id + count)))
+    engine = _engine(url, plan['sqlite_pragmas'])
+    with engine.begin() as conn:
+        conn.execute(db.metadata.tables[table_name].insert(), rows)
+    engine.dispose()
+    return count
+
+def _plan(engine, counts, seed):
+    plan = {
+        'seed': seed,
+        'password_hash': generate_password_hash('welkom123', current_app.config['PASSWORD_HASH_METHOD']),
+        # Chunks worden eventueel in andere processen zonder app context weggeschreven
+        'sqlite_pragmas': current_app.config.get('SQLITE_PRAGMAS'),
+    }
+    with engine.connect() as conn:
+        for table_name in TABLE_ORDER:
+            table = db.metadata.tables[table_name]
+            max_id = conn.execute(select(func.max(table.c.id))).scalar() or 0
+            plan[table_name] = {'start': max_id + 1, 'count': counts[table_name]}
+    if plan['policies']['count'] and not plan['users']['count']:
+        raise SystemExit('Polissen hebben nieuwe gebruikers nodig (--users > 0)')
+    if (plan['payments']['count'] or plan['claims']['count']) and not plan['policies']['count']:
+        raise SystemExit('Betalingen en claims hebben nieuwe polissen nodig (--policies > 0)')
+    return plan
+
+def generate(url, counts, seed=42, chunk_size=10000, processes=1):
+    """Vul de database op `url`; aanroepen binnen een app context."""
+    engine = _engine(url, current_app.config.get('SQLITE_PRAGMAS'))
+    db.metadata.create_all(engine)
+    run_migrations(engine)
+    plan = _plan(engine, counts, seed)
+    engine.dispose()
+
+    pool = multiprocessing.Pool(processes) if processes > 1 else None
+    try:
+        # Tabellen na elkaar (foreign keys), chunks binnen een tabel eventueel parallel
+        for table_name in TABLE_ORDER:
+            start, count = plan[table_name]['start'], plan[table_name]['count']
+            if not count:
+                continue
+            tasks = [
+                (url, plan, table_name, first_id, min(chunk_size, start + count - first_id))
+                for first_id in range(start, start + count, chunk_size)
+            ]
+            started = time.perf_counter()
+            results = pool.imap_unordered(_insert_chunk, tasks) if pool else map(_insert_chunk, tasks)
+            done = sum(results)
+            elapsed = time.perf_counter() - started
+            print(f'{table_name}: {done} rijen in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.0f} rijen/s)')
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    # Core inserts slaan de ORM events over; ETags van alle lijsten ongeldig maken
+    engine = _engine(url, plan['sqlite_pragmas'])
+    with engine.begin() as conn:
+        bump_resource_versions(conn, [GLOBAL_VERSION_KEY])
+    engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description='Genereer grote testdatasets met bulk inserts')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--policies', type=int, default=25000)
+    parser.add_argument('--payments', type=int, default=100000)
+    parser.add_argument('--claims', type=int, default=20000)
+    parser.add_argument('--appointments', type=int, default=10000)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--database', help='SQLAlchemy URL, standaard de database van de app')
+    args = parser.parse_args()
+
+    counts = {
+        'users': args.users,
+        'policies': args.policies,
+        'payments': args.payments,
+        'claims': args.claims,
+        'appointments': args.appointments,
+        'contact_messages': args.messages,
+    }
+    with create_app().app_context():
+        url = args.database or db.engine.url.render_as_string(hide_password=False)
+        generate(url, counts, args.seed, args.chunk_size, args.processes)
+        if not args.database:
+            # Core inserts slaan de ORM events over; rollups daarom opnieuw opbouwen
+            rebuild_statistics()
+            print('Statistieken opnieuw opgebouwd')
+
+if __name__ == '__main__':
+    main()
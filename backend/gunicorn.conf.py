@@ -0,0 +1,63 @@
+"""Gunicorn configuratie voor productie: `gunicorn -c gunicorn.conf.py wsgi:app`.
+
+Alle waarden zijn via de omgeving te overschrijven (GUNICORN_*, WEB_CONCURRENCY, PORT).
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5002')}")
+
+# Routes wachten vooral op de database (en de mail outbox), niet op CPU: threaded workers,
+# zodat een wachtende request de worker niet blokkeert. gevent kan als het geïnstalleerd is, en
+# is aan te raden bij veel open /api/events streams (elke stream houdt een gthread thread bezet).
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))  # alleen gevent
+
+# App één keer in de master laden; workers starten dan via fork zonder opnieuw te importeren
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Workers na een aantal requests (met spreiding) netjes vervangen, tegen geheugengroei
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+
+# Langer dan de standaard 2s zodat clients en proxies verbindingen hergebruiken; achter een
+# load balancer hoger zetten dan diens idle timeout
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-') or None  # leeg = geen access log
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+if os.path.isdir('/dev/shm'):
+    # Heartbeat bestanden in geheugen; voorkomt haperingen op trage (container) disks
+    worker_tmp_dir = '/dev/shm'
+
+# /metrics telt de tellers van alle workers op via deze map (zie SharedMetrics in app.py);
+# een scrape komt immers bij een willekeurige worker uit
+os.environ.setdefault('METRICS_DIR', os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    f"insurance-portal-metrics-{bind.rsplit(':', 1)[-1]}"
+))
+
+def on_starting(server):
+    # Na een herstart beginnen de tellers opnieuw (Prometheus vangt die reset op)
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+
+def worker_exit(server, worker):
+    # Laatste tellers wegschrijven; daarna gaan ze op in het totaal van gestopte workers
+    from app import shared_metrics
+    shared_metrics.flush()
+
+def post_fork(server, worker):
+    # Met preload_app bestaan de engines al in de master; verbindingen uit de pool
+    # mogen niet tussen processen gedeeld worden
+    from app import db
+    application = worker.app.wsgi()
+    with application.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,24 @@
+import argparse
+from app import create_app, start_mail_workers
+
+def run_mail_worker():
+    parser = argparse.ArgumentParser(description='Verstuur mails uit de outbox')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    args = parser.parse_args()
+
+    stop_event, threads = start_mail_workers(create_app(), args.workers, args.batch_size, args.poll_interval)
+    print(f"Mail worker gestart met {args.workers} threads")
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        print("Mail worker gestopt")
+
+if __name__ == '__main__':
+    run_mail_worker()
@@ -0,0 +1,13 @@
+from app import create_app, prepare_database
+
+def migrate():
+    app = create_app()
+    with app.app_context():
+        applied = prepare_database()
+        if applied:
+            print(f"Migraties uitgevoerd: {', '.join(str(v) for v in applied)}")
+        else:
+            print("Database is up-to-date")
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,10 @@
+from app import create_app, rebuild_statistics
+
+def rebuild():
+    app = create_app()
+    with app.app_context():
+        rebuild_statistics()
+        print("Statistieken zijn opnieuw opgebouwd")
+
+if __name__ == '__main__':
+    rebuild()
@@ -0,0 +1,29 @@
+"""Nachtelijke job: verlengingsherinneringen voor polissen die binnenkort verlopen.
+
+Bijvoorbeeld via cron (vanuit backend/):
+    0 2 * * * python renewal_reminders.py
+
+De mails gaan via de outbox en worden door mail_worker.py verstuurd. Opnieuw draaien op
+dezelfde dag gaat verder waar een afgebroken run stopte; --restart begint opnieuw.
+"""
+import argparse
+from datetime import date
+
+from app import create_app, scan_expiring_policies
+
+def run_renewal_reminders():
+    parser = argparse.ArgumentParser(description='Zet verlengingsherinneringen in de outbox')
+    parser.add_argument('--days', help='vensters in dagen, bijvoorbeeld 60,30,7 (standaard RENEWAL_REMINDER_DAYS)')
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--date', type=date.fromisoformat, default=None, help='peildatum (YYYY-MM-DD), standaard vandaag')
+    parser.add_argument('--restart', action='store_true', help='checkpoint van vandaag negeren')
+    args = parser.parse_args()
+
+    windows = [int(d) for d in args.days.split(',')] if args.days else None
+    with create_app().app_context():
+        checkpoint = scan_expiring_policies(args.date, windows, args.batch_size, args.restart)
+        print(f"{checkpoint.processed} polissen gescand, {checkpoint.queued} herinneringen in de outbox "
+              f"(run {checkpoint.run})")
+
+if __name__ == '__main__':
+    run_renewal_reminders()
@@ -0,0 +1,11 @@
+from app import create_app, prepare_database, seed_demo_data
+
+def seed():
+    app = create_app()
+    with app.app_context():
+        prepare_database()
+        added = seed_demo_data()
+        print(f"Demo data bijgewerkt: {', '.join(f'{count} {table}' for table, count in added.items())} toegevoegd")
+
+if __name__ == '__main__':
+    seed()
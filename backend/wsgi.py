@@ -0,0 +1,4 @@
+"""WSGI entrypoint, bijv. `gunicorn wsgi:app`. Het schema wordt apart bijgewerkt met migrate.py."""
+from app import create_app
+
+app = create_app()
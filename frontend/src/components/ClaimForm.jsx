@@ -124,7 +124,7 @@ const ClaimForm = ({ open, onClose, onSuccess, policies = [] }) => {
               name="document"
               hidden
               onChange={handleChange}
-              accept="application/pdf,image/*"
+              accept="application/pdf,image/png,image/jpeg,image/gif,image/webp"
             />
           </Button>
           {form.document && <Box sx={{ mb: 2 }}>{form.document.name}</Box>}
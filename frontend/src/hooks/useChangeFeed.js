@@ -0,0 +1,62 @@
+import { useRef } from 'react';
+import axios from 'axios';
+
+// Werkt een lijst (nieuwste eerst) bij met wijzigingen uit /api/changes: verwijderde items
+// eruit, gewijzigde vervangen, nieuwe bovenaan.
+export const applyChanges = (items, changes) => {
+  let result = items;
+  changes.forEach((change) => {
+    const exists = result.some(item => item.id === change.id);
+    if (change.action === 'deleted') {
+      result = result.filter(item => item.id !== change.id);
+    } else if (exists) {
+      result = result.map(item => (item.id === change.id ? change.data : item));
+    } else if (change.action === 'created') {
+      result = [change.data, ...result];
+    }
+  });
+  return result;
+};
+
+// Incrementele sync via /api/changes voor één resource. `start()` legt de cursor vast en
+// moet vóór het laden van de volledige lijst; `sync()` haalt daarna alleen wijzigingen op.
+// Is de cursor verlopen (410, na compactie) dan wordt alles opnieuw geladen via `reload`.
+const useChangeFeed = (resource, onChanges, reload) => {
+  const cursorRef = useRef(null);
+  const callbacksRef = useRef({ onChanges, reload });
+  callbacksRef.current = { onChanges, reload };
+
+  const start = async () => {
+    const res = await axios.get('/api/changes');
+    cursorRef.current = res.data.next_cursor;
+  };
+
+  const sync = async () => {
+    if (cursorRef.current === null) {
+      return callbacksRef.current.reload();
+    }
+    try {
+      let more = true;
+      while (more) {
+        const res = await axios.get('/api/changes', { params: { since: cursorRef.current } });
+        const changes = res.data.changes.filter(change => change.resource === resource);
+        if (changes.length) {
+          callbacksRef.current.onChanges(changes);
+        }
+        cursorRef.current = res.data.next_cursor;
+        more = res.data.has_more;
+      }
+    } catch (error) {
+      if (error.response && error.response.status === 410) {
+        await start();
+        return callbacksRef.current.reload();
+      }
+      console.error(`Error syncing ${resource}:`, error);
+    }
+    return undefined;
+  };
+
+  return { start, sync };
+};
+
+export default useChangeFeed;
@@ -0,0 +1,82 @@
+import { useEffect, useRef } from 'react';
+import axios from 'axios';
+import { API_URL } from '../config';
+
+const RECONNECT_DELAY_MS = 5000;
+
+// Luistert naar /api/events (server-sent events). `handlers` koppelt een eventtype aan een
+// callback; 'resync' komt als er notificaties gemist zijn en betekent: alles opnieuw ophalen.
+const useServerEvents = (handlers, enabled = true) => {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    if (!enabled || !localStorage.getItem('token') || typeof EventSource === 'undefined') {
+      return undefined;
+    }
+    let source = null;
+    let timer = null;
+    let closed = false;
+    let reconnecting = false;
+
+    const resync = () => {
+      const handler = handlersRef.current.resync;
+      if (handler) {
+        handler({});
+      }
+    };
+
+    const connect = async () => {
+      // EventSource kan geen Authorization header meesturen; in plaats van het JWT gaat een
+      // kortlevend stream ticket mee als query parameter
+      let ticket;
+      try {
+        const res = await axios.post('/api/events/ticket');
+        ticket = res.data.ticket;
+      } catch (err) {
+        ticket = null;
+      }
+      if (closed) {
+        return;
+      }
+      if (!ticket) {
+        timer = setTimeout(connect, RECONNECT_DELAY_MS);
+        return;
+      }
+      source = new EventSource(`${API_URL}/api/events?ticket=${encodeURIComponent(ticket)}`);
+      source.onopen = () => {
+        if (reconnecting) {
+          reconnecting = false;
+          resync();  // tijdens de onderbreking kunnen events gemist zijn
+        }
+      };
+      // Het ticket is verlopen bij een automatische reconnect: zelf opnieuw verbinden
+      source.onerror = () => {
+        source.close();
+        reconnecting = true;
+        if (!closed) {
+          timer = setTimeout(connect, RECONNECT_DELAY_MS);
+        }
+      };
+      Object.keys(handlersRef.current).forEach((type) => {
+        source.addEventListener(type, (event) => {
+          const handler = handlersRef.current[type];
+          if (handler) {
+            handler(event.data ? JSON.parse(event.data) : {});
+          }
+        });
+      });
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(timer);
+      if (source) {
+        source.close();
+      }
+    };
+  }, [enabled]);
+};
+
+export default useServerEvents;
@@ -1,75 +1,150 @@
-import React from 'react';
-import { Box, Typography, Paper, Table, TableHead, TableRow, TableCell, TableBody, Chip } from '@mui/material';
+import React, { useEffect, useState } from 'react';
+import { Box, Typography, Paper, Table, TableHead, TableRow, TableCell, TableBody, Chip, Button } from '@mui/material';
 import AccountBalanceIcon from '@mui/icons-material/AccountBalance';
+import axios from 'axios';
 
-// Demo data (vervang later door API-data)
-const payments = [
-  { id: 1, klant: 'Jordi Klaris', bedrag: 120.50, datum: '2025-04-01', status: 'Betaald' },
-  { id: 2, klant: 'Sanne de Vries', bedrag: 85.00, datum: '2025-04-03', status: 'Open' },
-  { id: 3, klant: 'Risk Pro Actief', bedrag: 240.00, datum: '2025-04-10', status: 'Betaald' },
-  { id: 4, klant: 'Jan Jansen', bedrag: 99.99, datum: '2025-04-14', status: 'Open' },
-];
+const AGING_LABELS = {
+  niet_vervallen: 'Nog niet vervallen',
+  '1-30': '1-30 dagen',
+  '31-60': '31-60 dagen',
+  '61-90': '61-90 dagen',
+  '90+': 'Meer dan 90 dagen',
+  onbekend: 'Zonder vervaldatum',
+};
 
-const statusColor = (status) => {
-  switch (status) {
-    case 'Betaald':
+const agingColor = (bucket) => {
+  switch (bucket) {
+    case 'niet_vervallen':
       return 'success';
-    case 'Open':
+    case '1-30':
+    case '31-60':
       return 'warning';
+    case '61-90':
+    case '90+':
+      return 'error';
     default:
       return 'default';
   }
 };
 
-const totalBedrag = payments.reduce((sum, p) => sum + p.bedrag, 0);
-const countBetaald = payments.filter(p => p.status === 'Betaald').length;
-const countOpen = payments.filter(p => p.status === 'Open').length;
-const totalCount = payments.length;
+const euro = (value) => value.toFixed(2);
+
+const Accounting = () => {
+  const [summary, setSummary] = useState(null);
+  const [customers, setCustomers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [error, setError] = useState('');
+
+  const fetchCustomers = async (cursor) => {
+    try {
+      const res = await axios.get('/api/accounting/customers', { params: cursor ? { cursor } : {} });
+      setCustomers(prev => (cursor ? [...prev, ...res.data.items] : res.data.items));
+      setNextCursor(res.data.next_cursor);
+    } catch (e) {
+      setError('Kon klantsaldi niet laden.');
+    }
+  };
 
-const Accounting = () => (
-  <Box sx={{ maxWidth: 900, mx: 'auto', p: 3 }}>
-    <Paper sx={{ p: 4, mb: 4 }}>
-      <Box sx={{ display: 'flex', alignItems: 'center', mb: 2 }}>
-        <AccountBalanceIcon sx={{ color: '#CCCC00', fontSize: 36, mr: 2 }} />
-        <Typography variant="h4" color="primary">Boekhouding</Typography>
-      </Box>
-      <Typography variant="body1" color="text.secondary" sx={{ mb: 2 }}>
-        Overzicht van betalingen en openstaande posten. Alleen zichtbaar voor admins.
-      </Typography>
-      <Table>
-        <TableHead>
-          <TableRow>
-            <TableCell>ID</TableCell>
-            <TableCell>Klant</TableCell>
-            <TableCell>Bedrag (€)</TableCell>
-            <TableCell>Datum</TableCell>
-            <TableCell>Status</TableCell>
-          </TableRow>
-        </TableHead>
-        <TableBody>
-          {payments.map((row) => (
-            <TableRow key={row.id}>
-              <TableCell>{row.id}</TableCell>
-              <TableCell>{row.klant}</TableCell>
-              <TableCell>{row.bedrag.toFixed(2)}</TableCell>
-              <TableCell>{row.datum}</TableCell>
-              <TableCell><Chip label={row.status} color={statusColor(row.status)} size="small" /></TableCell>
+  useEffect(() => {
+    axios.get('/api/accounting/summary')
+      .then(res => setSummary(res.data))
+      .catch(() => setError('Kon boekhouding niet laden.'));
+    fetchCustomers(null);
+    // eslint-disable-next-line
+  }, []);
+
+  return (
+    <Box sx={{ maxWidth: 900, mx: 'auto', p: 3 }}>
+      <Paper sx={{ p: 4, mb: 4 }}>
+        <Box sx={{ display: 'flex', alignItems: 'center', mb: 2 }}>
+          <AccountBalanceIcon sx={{ color: '#CCCC00', fontSize: 36, mr: 2 }} />
+          <Typography variant="h4" color="primary">Boekhouding</Typography>
+        </Box>
+        <Typography variant="body1" color="text.secondary" sx={{ mb: 2 }}>
+          Overzicht van betalingen en openstaande posten. Alleen zichtbaar voor admins.
+        </Typography>
+        {error && <Typography color="error" sx={{ mb: 2 }}>{error}</Typography>}
+        {summary && (
+          <>
+            <Box sx={{ mb: 3 }}>
+              <Chip label={`Verschuldigd: € ${euro(summary.totals.due)}`} sx={{ mr: 1 }} />
+              <Chip label={`Betaald: € ${euro(summary.totals.paid)}`} color="success" sx={{ mr: 1 }} />
+              <Chip label={`Openstaand: € ${euro(summary.totals.outstanding)}`} color="warning" sx={{ mr: 1 }} />
+              <Chip label={`${summary.totals.open_payments} open betalingen`} variant="outlined" />
+            </Box>
+            <Typography variant="h6" sx={{ mb: 1 }}>Ouderdom openstaande posten</Typography>
+            <Box sx={{ mb: 3 }}>
+              {Object.entries(summary.aging).filter(([, v]) => v.count > 0).map(([bucket, v]) => (
+                <Chip
+                  key={bucket}
+                  label={`${AGING_LABELS[bucket] || bucket}: € ${euro(v.amount)} (${v.count})`}
+                  color={agingColor(bucket)}
+                  size="small"
+                  sx={{ mr: 1, mb: 1 }}
+                />
+              ))}
+            </Box>
+            <Typography variant="h6" sx={{ mb: 1 }}>Per maand</Typography>
+            <Table size="small" sx={{ mb: 3 }}>
+              <TableHead>
+                <TableRow>
+                  <TableCell>Maand</TableCell>
+                  <TableCell>Verschuldigd (€)</TableCell>
+                  <TableCell>Betaald (€)</TableCell>
+                  <TableCell>Openstaand (€)</TableCell>
+                </TableRow>
+              </TableHead>
+              <TableBody>
+                {summary.months.map(row => (
+                  <TableRow key={row.month}>
+                    <TableCell>{row.month}</TableCell>
+                    <TableCell>{euro(row.due)}</TableCell>
+                    <TableCell>{euro(row.paid)}</TableCell>
+                    <TableCell>{euro(row.outstanding)}</TableCell>
+                  </TableRow>
+                ))}
+              </TableBody>
+            </Table>
+          </>
+        )}
+        <Typography variant="h6" sx={{ mb: 1 }}>Per klant</Typography>
+        <Table>
+          <TableHead>
+            <TableRow>
+              <TableCell>Klant</TableCell>
+              <TableCell>Verschuldigd (€)</TableCell>
+              <TableCell>Betaald (€)</TableCell>
+              <TableCell>Openstaand (€)</TableCell>
+              <TableCell>Status</TableCell>
             </TableRow>
-          ))}
-          {/* Cumulatieve rij */}
-          <TableRow sx={{ backgroundColor: '#f3f3f3', fontWeight: 600 }}>
-            <TableCell colSpan={2}><strong>Totaal / Cumulatief</strong></TableCell>
-            <TableCell><strong>{totalBedrag.toFixed(2)}</strong></TableCell>
-            <TableCell><strong>{totalCount} betalingen</strong></TableCell>
-            <TableCell>
-              <Chip label={`Betaald: ${countBetaald}`} color="success" size="small" sx={{ mr: 1 }} />
-              <Chip label={`Open: ${countOpen}`} color="warning" size="small" />
-            </TableCell>
-          </TableRow>
-        </TableBody>
-      </Table>
-    </Paper>
-  </Box>
-);
+          </TableHead>
+          <TableBody>
+            {customers.map((row) => (
+              <TableRow key={row.user_id}>
+                <TableCell>{row.name || row.email || row.user_id}</TableCell>
+                <TableCell>{euro(row.due)}</TableCell>
+                <TableCell>{euro(row.paid)}</TableCell>
+                <TableCell>{euro(row.outstanding)}</TableCell>
+                <TableCell>
+                  {row.open_payments > 0
+                    ? <Chip label={`Open: ${row.open_payments}`} color="warning" size="small" />
+                    : <Chip label="Betaald" color="success" size="small" />}
+                </TableCell>
+              </TableRow>
+            ))}
+            {customers.length === 0 && (
+              <TableRow>
+                <TableCell colSpan={5} sx={{ textAlign: 'center', color: '#999' }}>Geen betalingen gevonden.</TableCell>
+              </TableRow>
+            )}
+          </TableBody>
+        </Table>
+        {nextCursor && (
+          <Button sx={{ mt: 2 }} onClick={() => fetchCustomers(nextCursor)}>Meer laden</Button>
+        )}
+      </Paper>
+    </Box>
+  );
+};
 
 export default Accounting;
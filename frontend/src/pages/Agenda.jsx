@@ -8,6 +8,7 @@ import { DateTimePicker } from '@mui/x-date-pickers/DateTimePicker';
 import { useAuth } from '../contexts/AuthContext';
 import axios from 'axios';
 import { format } from 'date-fns';
+import useServerEvents from '../hooks/useServerEvents';
 
 function Agenda() {
   const { user } = useAuth();
@@ -32,6 +33,8 @@ function Agenda() {
     // eslint-disable-next-line
   }, []);
 
+  useServerEvents({ 'appointment.created': fetchAppointments, resync: fetchAppointments }, Boolean(user));
+
   const handleAdd = async () => {
     if (!title || !start) {
       setError('Vul alle verplichte velden in.');
@@ -41,8 +44,8 @@ function Agenda() {
       const startDate = new Date(start);
       const endDate = new Date(startDate.getTime() + 60 * 60 * 1000); // +1 uur
       await axios.post('/api/appointments', {
-        title,
-        description,
+        onderwerp: title,
+        notities: description,
         start: startDate.toISOString(),
         end: endDate.toISOString(),
       });
@@ -53,7 +56,11 @@ function Agenda() {
       setError('');
       fetchAppointments();
     } catch (e) {
-      setError('Kon afspraak niet opslaan.');
+      if (e.response && e.response.status === 409) {
+        setError('Er staat op dat tijdstip al een afspraak gepland.');
+      } else {
+        setError('Kon afspraak niet opslaan.');
+      }
     }
   };
 
@@ -88,8 +95,8 @@ function Agenda() {
             <tbody>
               {appointments.map(appt => (
                 <tr key={appt.id}>
-                  <td style={{ padding: 8 }}>{appt.title}</td>
-                  <td style={{ padding: 8 }}>{appt.description}</td>
+                  <td style={{ padding: 8 }}>{appt.onderwerp}</td>
+                  <td style={{ padding: 8 }}>{appt.notities}</td>
                   <td style={{ padding: 8 }}>{format(new Date(appt.start), 'dd-MM-yyyy HH:mm')}</td>
                   <td style={{ padding: 8 }}>{format(new Date(appt.end), 'dd-MM-yyyy HH:mm')}</td>
                   {user && user.role === 'admin' && (
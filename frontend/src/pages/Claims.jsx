@@ -20,6 +20,8 @@ import {
 import CloseIcon from '@mui/icons-material/Close';
 import axios from 'axios';
 import ClaimForm from '../components/ClaimForm';
+import useServerEvents from '../hooks/useServerEvents';
+import useChangeFeed, { applyChanges } from '../hooks/useChangeFeed';
 
 const getStatusColor = (status) => {
   switch (status.toLowerCase()) {
@@ -36,6 +38,39 @@ const getStatusColor = (status) => {
 
 import { useAuth } from '../contexts/AuthContext';
 
+// Documenten op de API server worden met de Authorization header als blob opgehaald en
+// gedownload, zodat het token nooit in een URL (en dus in logs) terechtkomt. Externe
+// (oude) URLs blijven gewone links.
+const DOCUMENT_EXTENSIONS = {
+  'application/pdf': 'pdf',
+  'image/png': 'png',
+  'image/jpeg': 'jpg',
+  'image/gif': 'gif',
+  'image/webp': 'webp',
+};
+
+const downloadDocument = async (url) => {
+  const res = await axios.get(url, { responseType: 'blob' });
+  const objectUrl = URL.createObjectURL(res.data);
+  const link = document.createElement('a');
+  link.href = objectUrl;
+  link.download = `${url.split('/').pop()}.${DOCUMENT_EXTENSIONS[res.data.type] || 'bin'}`;
+  link.click();
+  setTimeout(() => URL.revokeObjectURL(objectUrl), 10000);
+};
+
+const DocumentLink = ({ url }) => {
+  if (!url.startsWith('/api/')) {
+    return <a href={url} target="_blank" rel="noopener noreferrer" onClick={e => e.stopPropagation()}>Bekijk Document</a>;
+  }
+  const handleClick = (e) => {
+    e.preventDefault();
+    e.stopPropagation();
+    downloadDocument(url).catch(error => console.error('Error downloading document:', error));
+  };
+  return <a href={url} onClick={handleClick}>Bekijk Document</a>;
+};
+
 const Claims = () => {
   const { user } = useAuth();
   const [claims, setClaims] = useState([]);
@@ -61,7 +96,7 @@ const Claims = () => {
   const fetchClaims = async () => {
     try {
       const response = await axios.get('/api/claims');
-      setClaims(response.data);
+      setClaims(response.data.items);
     } catch (error) {
       console.error('Error fetching claims:', error);
     }
@@ -76,21 +111,43 @@ const Claims = () => {
     }
   };
 
+  // Na het eerste laden alleen nog gewijzigde claims ophalen
+  const claimFeed = useChangeFeed('claims', changes => setClaims(prev => applyChanges(prev, changes)), fetchClaims);
+
   useEffect(() => {
-    fetchClaims();
-    fetchPolicies();
-    if (user && user.role === 'admin') {
-      axios.get('/api/users').then(res => setUsers(res.data)).catch(() => {});
+    if (!user) {
+      return;
     }
+    // Claims, polissen en (voor admins) gebruikers in één request; de change feed cursor
+    // wordt eerst vastgelegd zodat er tussendoor niets gemist wordt
+    const include = user.role === 'admin' ? 'claims,policies,users' : 'claims,policies';
+    claimFeed.start()
+      .catch(error => console.error('Error starting change feed:', error))
+      .then(() => axios.get('/api/dashboard', { params: { include } }))
+      .then(res => {
+        const skipped = res.data.skipped || [];
+        if (res.data.claims) setClaims(res.data.claims.items);
+        if (res.data.policies) setPolicies(res.data.policies);
+        if (res.data.users) setUsers(res.data.users.items);
+        // Secties die buiten het tijdsbudget vielen alsnog los ophalen
+        if (skipped.includes('claims')) fetchClaims();
+        if (skipped.includes('policies')) fetchPolicies();
+        if (skipped.includes('users')) axios.get('/api/users', { params: { fields: 'id,name,email', sort: 'name', per_page: 500 } }).then(r => setUsers(r.data.items)).catch(() => {});
+      })
+      .catch(error => console.error('Error fetching dashboard:', error));
   }, [user]);
 
+  // Nieuwe claims (ook van andere gebruikers, voor admin/adviseur) live binnenhalen; de
+  // change feed mist niets, dus ook bij gemiste notificaties volstaat een sync
+  useServerEvents({ 'claim.created': claimFeed.sync, resync: claimFeed.sync }, Boolean(user));
+
   // Admin: claims ophalen voor geselecteerde gebruiker
   const handleUserClick = async (userObj) => {
     setSelectedUser(userObj);
     setUserDialogOpen(true);
     try {
       const res = await axios.get(`/api/claims?user_id=${userObj.id}`);
-      setUserClaims(res.data);
+      setUserClaims(res.data.items);
     } catch (err) {
       setUserClaims([]);
     }
@@ -135,9 +192,7 @@ const Claims = () => {
                       </TableCell>
                       <TableCell>
                         {claim.document_url ? (
-                          <a href={claim.document_url} target="_blank" rel="noopener noreferrer">
-                            Bekijk Document
-                          </a>
+                          <DocumentLink url={claim.document_url} />
                         ) : 'Geen document'}
                       </TableCell>
                     </TableRow>
@@ -193,9 +248,7 @@ const Claims = () => {
                     </TableCell>
                     <TableCell>
                       {claim.document_url ? (
-                        <a href={claim.document_url} target="_blank" rel="noopener noreferrer">
-                          Bekijk Document
-                        </a>
+                        <DocumentLink url={claim.document_url} />
                       ) : 'Geen document'}
                     </TableCell>
                   </TableRow>
@@ -243,9 +296,7 @@ const Claims = () => {
                 </TableCell>
                 <TableCell>
                   {claim.document_url ? (
-                    <a href={claim.document_url} target="_blank" rel="noopener noreferrer" onClick={e => e.stopPropagation()}>
-                      Bekijk Document
-                    </a>
+                    <DocumentLink url={claim.document_url} />
                   ) : (
                     'Geen document'
                   )}
@@ -281,7 +332,7 @@ const Claims = () => {
               </Typography>
               {selectedClaim.document_url && (
                 <Typography variant="body1" sx={{ mt: 1 }}>
-                  <b>Document:</b> <a href={selectedClaim.document_url} target="_blank" rel="noopener noreferrer">Bekijk Document</a>
+                  <b>Document:</b> <DocumentLink url={selectedClaim.document_url} />
                 </Typography>
               )}
               {selectedClaim.beschrijving && (
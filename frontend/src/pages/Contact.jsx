@@ -12,27 +12,42 @@ import {
 } from '@mui/material';
 import axios from 'axios';
 import { useAuth } from '../contexts/AuthContext';
+import useServerEvents from '../hooks/useServerEvents';
 
 const Contact = () => {
   const { user, loading } = useAuth();
   const [messages, setMessages] = useState([]);
   const [loadingMessages, setLoadingMessages] = useState(false);
   const [errorMessages, setErrorMessages] = useState(null);
+  const [search, setSearch] = useState('');
+  const [refreshKey, setRefreshKey] = useState(0);
+
+  // Nieuwe berichten worden gepusht; de lijst (of zoekopdracht) wordt dan opnieuw opgehaald
+  const refresh = () => setRefreshKey(key => key + 1);
+  useServerEvents({ 'contact.created': refresh, resync: refresh }, Boolean(user && user.role === 'admin'));
 
   useEffect(() => {
     if (user && user.role === 'admin') {
-      setLoadingMessages(true);
-      axios.get('/api/contact')
-        .then(res => {
-          setMessages(res.data);
-          setErrorMessages(null);
-        })
-        .catch(err => {
-          setErrorMessages('Fout bij ophalen berichten');
-        })
-        .finally(() => setLoadingMessages(false));
+      // Zoeken gebeurt op de server; kort wachten zodat niet elke toetsaanslag een request is
+      const timer = setTimeout(() => {
+        setLoadingMessages(true);
+        const query = search.trim();
+        const request = query
+          ? axios.get('/api/contact/search', { params: { q: query, per_page: 50 } }).then(res => res.data.items)
+          : axios.get('/api/contact', { params: { per_page: 50 } }).then(res => res.data.items);
+        request
+          .then(items => {
+            setMessages(items);
+            setErrorMessages(null);
+          })
+          .catch(err => {
+            setErrorMessages('Fout bij ophalen berichten');
+          })
+          .finally(() => setLoadingMessages(false));
+      }, search ? 300 : 0);
+      return () => clearTimeout(timer);
     }
-  }, [user]);
+  }, [user, search, refreshKey]);
   const [formData, setFormData] = useState({
     naam: '',
     email: '',
@@ -93,6 +108,14 @@ const Contact = () => {
           <Typography variant="h5" gutterBottom color="primary">
             Ingezonden Contactberichten
           </Typography>
+          <TextField
+            fullWidth
+            size="small"
+            label="Zoeken op naam, e-mail, onderwerp of bericht"
+            value={search}
+            onChange={(e) => setSearch(e.target.value)}
+            sx={{ mb: 2 }}
+          />
           {loadingMessages ? (
             <Typography variant="body2">Laden...</Typography>
           ) : errorMessages ? (
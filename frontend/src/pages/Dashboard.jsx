@@ -1,4 +1,5 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+import axios from 'axios';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import { Grid, Paper, Typography, Box, Card, CardContent } from '@mui/material';
@@ -81,6 +82,15 @@ const StatCard = ({ icon, value, label }) => (
 const Dashboard = () => {
   const { user, loading } = useAuth();
   const navigate = useNavigate();
+  const [summary, setSummary] = useState(null);
+
+  useEffect(() => {
+    if (user && user.role === 'admin') {
+      axios.get('/api/dashboard', { params: { include: 'summary' } })
+        .then(res => setSummary(res.data.summary || null))
+        .catch(() => setSummary(null));
+    }
+  }, [user]);
 
   if (loading) {
     return <Typography>Bezig met laden...</Typography>;
@@ -125,14 +135,14 @@ const Dashboard = () => {
             <Grid item xs={12} sm={6} md={4}>
               <StatCard
                 icon={<Person />}
-                value="124"
+                value={summary ? summary.total_customers : '-'}
                 label="Totaal klanten"
               />
             </Grid>
             <Grid item xs={12} sm={6} md={4}>
               <StatCard
                 icon={<Security />}
-                value="89"
+                value={summary ? summary.active_policies : '-'}
                 label="Actieve polissen"
               />
             </Grid>
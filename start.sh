@@ -1,5 +1,16 @@
 #!/bin/bash
 
+# Productie: schema bijwerken, daarna gunicorn (zie backend/gunicorn.conf.py). Demo data
+# (met bekende wachtwoorden) alleen met een expliciete --seed, bijvoorbeeld voor een demo omgeving
+if [ "$1" = "--production" ]; then
+    cd "$(dirname "$0")/backend"
+    python migrate.py || exit 1
+    if [ "$2" = "--seed" ]; then
+        python seed.py || exit 1
+    fi
+    exec gunicorn -c gunicorn.conf.py wsgi:app
+fi
+
 # Start backend
 cd "$(dirname "$0")/backend"
 python app.py &